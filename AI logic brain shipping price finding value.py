@@ -1,4 +1,4 @@
-import requests
+from instrumentation import http_request, timed
 import sqlite3  # Replace with your actual DB connector
 
 # Database functions
@@ -49,7 +49,11 @@ def update_profit(product_id, profit):
     conn.commit()
     conn.close()
 
+# Set to order_writer.GroupCommitWriter().start() to batch order commits under high checkout rates
+order_writer = None
+
 # Core function
+@timed("checkout.checkout_product")
 def checkout_product(product_id, quantity, buyer_address):
     product = get_product_from_db(product_id)
     supplier_price = product["supplier_price"]
@@ -57,8 +61,10 @@ def checkout_product(product_id, quantity, buyer_address):
     supplier_api = product["supplier_api_url"]
 
     # Ask supplier for shipping
-    response = requests.post(
+    response = http_request(
+        "POST",
         f"{supplier_api}/get_shipping",
+        endpoint="supplier.get_shipping",
         json={
             "product_id": product_id,
             "quantity": quantity,
@@ -85,8 +91,11 @@ def checkout_product(product_id, quantity, buyer_address):
         "selling_price": selling_price,
         "profit": profit
     }
-    order_id = save_order(order_data)
-    update_profit(product_id, profit)
+    if order_writer is not None:
+        order_id = order_writer.submit(order_data)
+    else:
+        order_id = save_order(order_data)
+        update_profit(product_id, profit)
 
     # Return structured info for frontend
     return {
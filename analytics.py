@@ -0,0 +1,112 @@
+import heapq
+import itertools
+
+
+class AnalyticsAggregator:
+    """Single-pass aggregate over analytics rows.
+
+    Rows are folded in one at a time, so memory stays constant in the number of rows
+    (it only grows with the number of distinct days). Two aggregates can be merged,
+    which lets a run continue from a saved aggregate instead of re-reading everything:
+    `last_id` is the highest NocoDB row Id folded in so far, and the next run only reads
+    rows after it.
+    """
+
+    def __init__(self, top_k=5):
+        self.top_k = top_k
+        self.rows = 0
+        self.total_sales = 0
+        self.total_engagement = 0
+        self.daily = {}
+        self.last_id = None
+        self._top = []  # min-heap of (sales, seq, row)
+        self._seq = itertools.count()
+
+    def add(self, row):
+        sales = row.get("sales", 0) or 0
+        engagement = row.get("engagement", 0) or 0
+        self.rows += 1
+        self.total_sales += sales
+        self.total_engagement += engagement
+
+        day = str(row.get("date") or row.get("CreatedAt") or "")[:10] or "unknown"
+        bucket = self.daily.setdefault(day, {"sales": 0, "engagement": 0, "rows": 0})
+        bucket["sales"] += sales
+        bucket["engagement"] += engagement
+        bucket["rows"] += 1
+
+        row_id = row.get("Id")
+        if row_id is not None and (self.last_id is None or row_id > self.last_id):
+            self.last_id = row_id
+
+        self._push_top(sales, row)
+
+    def add_rows(self, rows):
+        for row in rows:
+            self.add(row)
+        return self
+
+    def _push_top(self, sales, row):
+        entry = (sales, next(self._seq), row)
+        if len(self._top) < self.top_k:
+            heapq.heappush(self._top, entry)
+        elif sales > self._top[0][0]:
+            heapq.heapreplace(self._top, entry)
+
+    def merge(self, other):
+        self.rows += other.rows
+        self.total_sales += other.total_sales
+        self.total_engagement += other.total_engagement
+        for day, bucket in other.daily.items():
+            mine = self.daily.setdefault(day, {"sales": 0, "engagement": 0, "rows": 0})
+            for key in mine:
+                mine[key] += bucket[key]
+        if other.last_id is not None and (self.last_id is None or other.last_id > self.last_id):
+            self.last_id = other.last_id
+        for sales, _, row in other._top:
+            self._push_top(sales, row)
+        return self
+
+    def top_products(self):
+        return [row for _, _, row in sorted(self._top, key=lambda e: (-e[0], e[1]))]
+
+    def report(self):
+        top = self.top_products()
+        return {
+            "total_sales": self.total_sales,
+            "top_product": top[0] if top else {},
+            "top_products": top,
+            "average_engagement": round(self.total_engagement / max(self.rows, 1), 2),
+            "daily": {
+                day: {
+                    "sales": b["sales"],
+                    "average_engagement": round(b["engagement"] / max(b["rows"], 1), 2),
+                    "rows": b["rows"]
+                }
+                for day, b in sorted(self.daily.items())
+            }
+        }
+
+    # Saved state for incremental runs
+    def to_dict(self):
+        return {
+            "top_k": self.top_k,
+            "rows": self.rows,
+            "total_sales": self.total_sales,
+            "total_engagement": self.total_engagement,
+            "daily": self.daily,
+            "last_id": self.last_id,
+            "top": self.top_products()
+        }
+
+    @classmethod
+    def from_dict(cls, state):
+        agg = cls(top_k=state.get("top_k", 5))
+        agg.rows = state.get("rows", 0)
+        agg.total_sales = state.get("total_sales", 0)
+        agg.total_engagement = state.get("total_engagement", 0)
+        agg.daily = {day: dict(b) for day, b in state.get("daily", {}).items()}
+        agg.last_id = state.get("last_id")
+        for row in state.get("top", []):
+            agg._push_top(row.get("sales", 0) or 0, row)
+        return agg
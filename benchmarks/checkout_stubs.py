@@ -0,0 +1,110 @@
+"""
+Stand-ins for the modules `checkout manager.py` imports but this repo doesn't ship
+(database, ai_fraud_detection, stripe, paypalrestsdk), so process_order can be benchmarked.
+
+The database stub reads and writes the benchmark's store.db (relative to cwd), the fraud
+check never flags, and the payment SDKs succeed immediately without any network call.
+install() puts them into sys.modules; it must run before the checkout module is loaded.
+"""
+
+import sqlite3
+import sys
+import types
+from itertools import count
+
+_payment_ids = count(1)
+
+
+def _database():
+    db = types.ModuleType("database")
+
+    def get_product_from_db(product_id):
+        conn = sqlite3.connect("store.db")
+        try:
+            row = conn.execute(
+                "SELECT id, name, supplier_id, supplier_price, selling_price, supplier_api_url FROM products WHERE id=?",
+                (product_id,)
+            ).fetchone()
+        finally:
+            conn.close()
+        if not row:
+            raise Exception("Product not found")
+        return dict(zip(("id", "name", "supplier_id", "supplier_price", "selling_price", "supplier_api_url"), row))
+
+    def save_order(order_data):
+        address = order_data["buyer_address"]
+        conn = sqlite3.connect("store.db", timeout=30)
+        try:
+            cursor = conn.execute("""
+                INSERT INTO orders (product_id, quantity, buyer_country, buyer_region, buyer_city, buyer_postal, supplier_price, shipping_cost, selling_price, profit)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """, (
+                order_data["product_id"], order_data["quantity"],
+                address["country"], address["region"], address["city"], address["postal_code"],
+                order_data["supplier_price"], order_data["shipping_cost"],
+                order_data["selling_price"], order_data["profit"]
+            ))
+            conn.commit()
+            return cursor.lastrowid
+        finally:
+            conn.close()
+
+    def update_profit(product_id, profit):
+        conn = sqlite3.connect("store.db", timeout=30)
+        try:
+            conn.execute("UPDATE products SET total_profit = total_profit + ? WHERE id=?", (profit, product_id))
+            conn.commit()
+        finally:
+            conn.close()
+
+    db.get_product_from_db = get_product_from_db
+    db.save_order = save_order
+    db.update_profit = update_profit
+    db.flag_suspicious_activity = lambda customer_id, product_id: None
+    db.freeze_account = lambda customer_id: None
+    db.get_supplier_info = lambda supplier_id: {
+        "id": supplier_id, "payment_method": "stripe", "stripe_account_id": f"acct_{supplier_id}"
+    }
+    db.record_supplier_payment = lambda supplier_id, amount: None
+    return db
+
+
+def _fraud():
+    fraud = types.ModuleType("ai_fraud_detection")
+    fraud.detect_suspicious_activity = lambda customer, product_id, quantity, buyer_address: False
+    return fraud
+
+
+def _stripe():
+    stripe = types.ModuleType("stripe")
+    stripe.api_key = None
+    stripe.PaymentIntent = types.SimpleNamespace(
+        create=lambda **kwargs: {"id": f"pi_{next(_payment_ids)}", "status": "succeeded"}
+    )
+    stripe.Transfer = types.SimpleNamespace(
+        create=lambda **kwargs: {"id": f"tr_{next(_payment_ids)}"}
+    )
+    return stripe
+
+
+def _paypal():
+    paypal = types.ModuleType("paypalrestsdk")
+
+    class _Resource:
+        def __init__(self, data):
+            self.data = data
+
+        def create(self, **kwargs):
+            return True
+
+    paypal.configure = lambda options: None
+    paypal.Payment = _Resource
+    paypal.Payout = _Resource
+    return paypal
+
+
+def install():
+    """Register the stubs, shadowing real installs too: a benchmark must never charge anyone."""
+    for name, build in (("database", _database), ("ai_fraud_detection", _fraud),
+                        ("stripe", _stripe), ("paypalrestsdk", _paypal)):
+        sys.modules[name] = build()
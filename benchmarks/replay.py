@@ -0,0 +1,176 @@
+"""
+Replay captured traffic (see traffic_capture.py) against a local stub.
+
+The stub answers each request with the response captured for the same method and URL,
+optionally holding it for the captured server time. The driver re-issues the captured
+requests at their original pacing divided by --speed (--speed 0 sends as fast as
+possible) and prints a JSON report with throughput and per-endpoint p50/p99 latency.
+
+    python benchmarks/replay.py requests.jsonl --speed 10 --output replay.json
+"""
+
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+from collections import defaultdict, deque
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler
+from urllib.parse import urlsplit
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import requests  # noqa: E402
+from traffic_capture import read_capture  # noqa: E402
+from run_benchmarks import latency_summary  # noqa: E402
+from stub_servers import StubHTTPServer  # noqa: E402
+
+
+def path_of(url):
+    parts = urlsplit(url)
+    return parts.path + (f"?{parts.query}" if parts.query else "")
+
+
+class ReplayResponses:
+    """Captured responses keyed by (method, path), served in capture order."""
+
+    def __init__(self, entries, server_latency=False, speed=1.0):
+        self.server_latency = server_latency
+        self.speed = speed
+        self.lock = threading.Lock()
+        self.queues = defaultdict(deque)
+        self.last = {}
+        for e in entries:
+            if e.get("status") is None:
+                continue
+            key = (e["method"], path_of(e["url"]))
+            self.queues[key].append(e)
+            self.last[key] = e
+
+    def next(self, method, path):
+        key = (method, path)
+        with self.lock:
+            queue = self.queues.get(key)
+            return queue.popleft() if queue else self.last.get(key)
+
+
+class ReplayHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def _handle(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        if length:
+            self.rfile.read(length)
+        responses = self.server.responses
+        entry = responses.next(self.command, self.path)
+        if entry is None:
+            status, body = 404, json.dumps({"error": "not in capture"})
+        else:
+            if responses.server_latency and entry.get("elapsed_ms"):
+                time.sleep(entry["elapsed_ms"] / 1000 / (responses.speed or 1))
+            status, body = entry["status"], entry.get("response_body") or ""
+        data = body.encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    do_GET = do_POST = do_PATCH = do_PUT = do_DELETE = _handle
+
+
+def replay(entries, speed=1.0, server_latency=True, concurrency=32):
+    entries = sorted(entries, key=lambda e: e["ts"])
+    if not entries:
+        return {"requests": 0}
+
+    server = StubHTTPServer(("127.0.0.1", 0), ReplayHandler)
+    server.responses = ReplayResponses(entries, server_latency=server_latency, speed=speed)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = "http://%s:%s" % server.server_address[:2]
+
+    latencies = defaultdict(list)
+    errors = defaultdict(int)
+    mismatches = defaultdict(int)
+    lock = threading.Lock()
+
+    def send(entry):
+        headers = {"Content-Type": "application/json"} if entry.get("request_body") else {}
+        start = time.perf_counter()
+        try:
+            res = requests.request(entry["method"], base + path_of(entry["url"]),
+                                   data=entry.get("request_body"), headers=headers, timeout=60)
+            status = res.status_code
+        except Exception:
+            status = None
+        elapsed = time.perf_counter() - start
+        endpoint = entry.get("endpoint") or "unknown"
+        with lock:
+            latencies[endpoint].append(elapsed)
+            if status is None or status >= 400:
+                errors[endpoint] += 1
+            if entry.get("status") is not None and status != entry["status"]:
+                mismatches[endpoint] += 1
+
+    first_ts = entries[0]["ts"]
+    start = time.perf_counter()
+    try:
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            for entry in entries:
+                if speed:
+                    delay = (entry["ts"] - first_ts) / speed - (time.perf_counter() - start)
+                    if delay > 0:
+                        time.sleep(delay)
+                pool.submit(send, entry)
+        elapsed = time.perf_counter() - start
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    captured_span = entries[-1]["ts"] - first_ts
+    return {
+        "requests": len(entries),
+        "speed": speed,
+        "captured_span_s": round(captured_span, 4),
+        "elapsed_s": round(elapsed, 4),
+        "requests_per_s": round(len(entries) / elapsed, 2) if elapsed else None,
+        "latency": latency_summary([s for samples in latencies.values() for s in samples]),
+        "endpoints": {
+            name: {
+                **latency_summary(samples),
+                "errors": errors[name],
+                "status_mismatches": mismatches[name]
+            }
+            for name, samples in sorted(latencies.items())
+        }
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("capture", nargs="?", default="requests.jsonl")
+    parser.add_argument("--speed", type=float, default=1.0, help="pacing multiplier; 0 = as fast as possible")
+    parser.add_argument("--no-server-latency", action="store_true", help="answer immediately instead of replaying captured server time")
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--output", help="write the JSON report here instead of stdout")
+    args = parser.parse_args(argv)
+
+    report = replay(list(read_capture(args.capture)), speed=args.speed,
+                    server_latency=not args.no_server_latency, concurrency=args.concurrency)
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output + "\n")
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,348 @@
+"""
+End-to-end benchmarks against local stub servers.
+
+Drives main.py cycles, smart supply core's run_sync_cycle, checkout_product and
+process_order against benchmarks/stub_servers.py and prints a JSON report with cycle
+times, requests per cycle and p50/p99 latencies.
+
+    python benchmarks/run_benchmarks.py --products 10000 --orders 100000 --output bench.json
+    python benchmarks/run_benchmarks.py --latency-ms 20 --error-rate 0.01 --scenarios sync_cycle
+"""
+
+import argparse
+import contextlib
+import importlib.util
+import io
+import json
+import logging
+import os
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import requests  # noqa: E402
+import instrumentation  # noqa: E402
+import traffic_capture  # noqa: E402
+import checkout_stubs  # noqa: E402
+from order_writer import GroupCommitWriter  # noqa: E402
+from stub_servers import StubServer  # noqa: E402
+
+SCENARIOS = ["main_cycle", "sync_cycle", "checkout_product", "process_order"]
+
+
+def load_module(filename, name):
+    """Import one of the repo's scripts whose file name isn't a valid module name."""
+    spec = importlib.util.spec_from_file_location(name, os.path.join(ROOT, filename))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def percentile(values, pct):
+    if not values:
+        return None
+    ordered = sorted(values)
+    index = max(int(round(pct / 100 * len(ordered))) - 1, 0)
+    return ordered[min(index, len(ordered) - 1)]
+
+
+def latency_summary(seconds):
+    ms = [s * 1000 for s in seconds]
+    return {
+        "count": len(ms),
+        "p50_ms": round(percentile(ms, 50), 3) if ms else None,
+        "p99_ms": round(percentile(ms, 99), 3) if ms else None,
+        "max_ms": round(max(ms), 3) if ms else None
+    }
+
+
+class HTTPTimer:
+    """Times every outbound `requests` call made while active."""
+
+    def __init__(self):
+        self.samples = []
+        self.errors = 0
+        self._original = None
+
+    def __enter__(self):
+        self._original = requests.sessions.Session.request
+        timer = self
+        original = self._original
+
+        def timed_request(session, method, url, *args, **kwargs):
+            start = time.perf_counter()
+            try:
+                res = original(session, method, url, *args, **kwargs)
+            except Exception:
+                timer.errors += 1
+                raise
+            finally:
+                timer.samples.append(time.perf_counter() - start)
+            if res.status_code >= 400:
+                timer.errors += 1
+            return res
+
+        requests.sessions.Session.request = timed_request
+        return self
+
+    def __exit__(self, *exc):
+        requests.sessions.Session.request = self._original
+
+
+def count_delta(before, after):
+    delta = after - before
+    return {"total": sum(delta.values()), **dict(sorted(delta.items()))}
+
+
+# --- Scenarios ---
+def bench_main_cycle(stub, args):
+    from main import run_cycle
+    from nocodb import NocoDB
+    from storemanager import StoreManager
+    from invoice_payment import InvoicePayment
+    from market_ai import MarketingAI
+
+    stub.state.seed_table("project_store", "products", (
+        {"id": i, "name": f"Product {i}", "stock": 100, "price": 19.99} for i in range(1, args.products + 1)
+    ))
+    stub.state.seed_table("project_store", "orders", (
+        {"id": i, "customer_name": f"Customer {i}", "status": "pending", "total_price": 24.5}
+        for i in range(1, args.orders + 1)
+    ))
+    nocodb = NocoDB(api_url=stub.url, token="bench")
+    systems = (StoreManager(nocodb), InvoicePayment(nocodb), MarketingAI(nocodb))
+
+    cycles = []
+    for _ in range(args.cycles):
+        before = stub.state.snapshot_counts()
+        with HTTPTimer() as timer, contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            run_cycle(*systems)
+            elapsed = time.perf_counter() - start
+        cycles.append({
+            "cycle_time_s": round(elapsed, 4),
+            "requests": count_delta(before, stub.state.snapshot_counts()),
+            "http_latency": latency_summary(timer.samples),
+            "http_errors": timer.errors
+        })
+    return {"cycles": cycles}
+
+
+def bench_sync_cycle(stub, args):
+    ssc = load_module("smart supply core.py", "smart_supply_core")
+    logging.getLogger("smart_supply_core").setLevel(logging.WARNING)
+    os.environ["BENCH_SUPPLIER_API_KEY"] = "bench"
+    os.environ["STORE_API_KEY"] = "bench"
+    os.environ["STORE_BASE_URL"] = stub.url
+
+    products = [{
+        "id": i,
+        "sku": f"SKU-{i}",
+        "supplier_entries": [2 * i, 2 * i + 1],
+        "current_selling_price": Decimal("19.60"),
+        "minimum_margin": Decimal("5.00")
+    } for i in range(1, args.products + 1)]
+
+    def fetch_supplier_entry(entry_id):
+        return {
+            "id": entry_id,
+            "supplier_name": f"Supplier{entry_id % 2}",
+            "supplier_product_id": f"SP-{entry_id}",
+            "supplier_id": entry_id % 2,
+            "quality_score": 90 - 10 * (entry_id % 2),
+            "supplier_api_key_env": "BENCH_SUPPLIER_API_KEY",
+            "supplier_base_url": stub.url
+        }
+
+    ssc.fetch_all_tracked_products = lambda: products
+    ssc.fetch_supplier_entry = fetch_supplier_entry
+
+    product_latency = []
+    sync_product_price = ssc.sync_product_price
+
+    def timed_sync(product):
+        start = time.perf_counter()
+        try:
+            return sync_product_price(product)
+        finally:
+            product_latency.append(time.perf_counter() - start)
+
+    ssc.sync_product_price = timed_sync
+
+    cycles = []
+    for _ in range(args.cycles):
+        product_latency.clear()
+        before = stub.state.snapshot_counts()
+        with HTTPTimer() as timer:
+            start = time.perf_counter()
+            ssc.run_sync_cycle()
+            elapsed = time.perf_counter() - start
+        cycles.append({
+            "cycle_time_s": round(elapsed, 4),
+            "requests": count_delta(before, stub.state.snapshot_counts()),
+            "product_latency": latency_summary(product_latency),
+            "http_latency": latency_summary(timer.samples),
+            "http_errors": timer.errors
+        })
+    return {"cycles": cycles}
+
+
+STORE_SCHEMA = """
+CREATE TABLE products (
+    id INTEGER PRIMARY KEY, name TEXT, supplier_id INTEGER, supplier_price REAL,
+    selling_price REAL, supplier_api_url TEXT, total_profit REAL DEFAULT 0
+);
+CREATE TABLE orders (
+    id INTEGER PRIMARY KEY AUTOINCREMENT, product_id INTEGER, quantity INTEGER,
+    buyer_country TEXT, buyer_region TEXT, buyer_city TEXT, buyer_postal TEXT,
+    supplier_price REAL, shipping_cost REAL, selling_price REAL, profit REAL
+);
+"""
+
+BUYER_ADDRESS = {"country": "Kenya", "region": "Nairobi", "city": "Nairobi", "postal_code": "00100"}
+
+
+def create_store_db(path, stub, products):
+    conn = sqlite3.connect(path)
+    conn.executescript(STORE_SCHEMA)
+    conn.executemany(
+        "INSERT INTO products (id, name, supplier_id, supplier_price, selling_price, supplier_api_url) VALUES (?, ?, ?, ?, ?, ?)",
+        ((i, f"Product {i}", 1, 5.0, 19.99, stub.url) for i in range(1, products + 1))
+    )
+    conn.commit()
+    conn.close()
+
+
+def run_orders(call, args):
+    """Run `args.orders` calls across `args.concurrency` threads, timing each one."""
+    latencies = []
+    errors = []
+    lock = threading.Lock()
+
+    def one(i):
+        start = time.perf_counter()
+        try:
+            result = call(i)
+            if isinstance(result, dict) and result.get("status") not in (None, "success"):
+                raise RuntimeError(result.get("message"))
+        except Exception as e:
+            with lock:
+                errors.append(type(e).__name__)
+        finally:
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        list(pool.map(one, range(args.orders)))
+    elapsed = time.perf_counter() - start
+    return elapsed, latencies, errors
+
+
+def bench_orders(stub, args, filename, module_name, make_call):
+    workdir = tempfile.mkdtemp(prefix="thunder-bench-")
+    cwd = os.getcwd()
+    os.chdir(workdir)  # the checkout modules open "store.db" relative to cwd
+    try:
+        create_store_db("store.db", stub, args.products)
+        module = load_module(filename, module_name)
+        call = make_call(module, args)
+        before = stub.state.snapshot_counts()
+        with HTTPTimer() as timer:
+            elapsed, latencies, errors = run_orders(call, args)
+        return {
+            "orders": args.orders,
+            "concurrency": args.concurrency,
+            "elapsed_s": round(elapsed, 4),
+            "orders_per_s": round(args.orders / elapsed, 2) if elapsed else None,
+            "requests": count_delta(before, stub.state.snapshot_counts()),
+            "order_latency": latency_summary(latencies),
+            "http_latency": latency_summary(timer.samples),
+            "errors": len(errors),
+            "error_types": sorted(set(errors))
+        }
+    finally:
+        os.chdir(cwd)
+
+
+def bench_checkout_product(stub, args):
+    def make_call(module, args):
+        if args.group_commit:
+            module.order_writer = GroupCommitWriter("store.db").start()
+        return lambda i: module.checkout_product(i % args.products + 1, 1 + i % 3, BUYER_ADDRESS)
+    return bench_orders(stub, args, "AI logic brain shipping price finding value.py", "checkout_logic", make_call)
+
+
+def bench_process_order(stub, args):
+    def make_call(module, args):
+        # No --group-commit here: process_order persists through the database module
+        customer = {"id": 1, "payment_method": "stripe", "stripe_payment_method": "pm_bench"}
+        return lambda i: module.process_order(customer, i % args.products + 1, 1 + i % 3, BUYER_ADDRESS)
+    # process_order imports database / fraud-detection / payment SDK modules the repo doesn't ship
+    checkout_stubs.install()
+    return bench_orders(stub, args, "checkout manager.py", "checkout_manager", make_call)
+
+
+BENCHMARKS = {
+    "main_cycle": bench_main_cycle,
+    "sync_cycle": bench_sync_cycle,
+    "checkout_product": bench_checkout_product,
+    "process_order": bench_process_order
+}
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--products", type=int, default=10000)
+    parser.add_argument("--orders", type=int, default=100000)
+    parser.add_argument("--cycles", type=int, default=3, help="cycles for main_cycle / sync_cycle")
+    parser.add_argument("--concurrency", type=int, default=4, help="threads for checkout scenarios")
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="added latency per stub request")
+    parser.add_argument("--jitter-ms", type=float, default=0.0, help="random extra latency per stub request")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of stub requests that return 500")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--scenarios", nargs="+", choices=SCENARIOS, default=SCENARIOS)
+    parser.add_argument("--group-commit", action="store_true", help="checkout_product saves orders through GroupCommitWriter")
+    parser.add_argument("--metrics", action="store_true", help="include per-stage/per-endpoint instrumentation")
+    parser.add_argument("--capture", help="append all outbound traffic to this JSONL file (see replay.py)")
+    parser.add_argument("--output", help="write the JSON report here instead of stdout")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.metrics:
+        instrumentation.enable()
+    if args.capture:
+        traffic_capture.start_capture(args.capture)
+    report = {"config": {k: v for k, v in vars(args).items() if k not in ("output", "capture")}, "scenarios": {}}
+    for name in args.scenarios:
+        # A fresh stub per scenario keeps seeded tables and counters independent
+        with StubServer(latency=args.latency_ms / 1000, jitter=args.jitter_ms / 1000,
+                        error_rate=args.error_rate, seed=args.seed) as stub:
+            print(f"⏱️ Running {name}...", file=sys.stderr)
+            instrumentation.metrics.reset()
+            start = time.perf_counter()
+            report["scenarios"][name] = BENCHMARKS[name](stub, args)
+            if args.metrics:
+                report["scenarios"][name]["metrics"] = instrumentation.metrics.to_dict()
+            print(f"   done in {time.perf_counter() - start:.2f}s", file=sys.stderr)
+    traffic_capture.stop_capture()
+
+    output = json.dumps(report, indent=2, default=str)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output + "\n")
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,212 @@
+"""
+Local stand-ins for the HTTP services ThunderBrain talks to, for benchmarking.
+
+- NocoDB:   GET/POST /api/v2/tables/{project}/{table}/records, PATCH .../records/{id}
+- Supplier: GET /products/{id}, POST /shipping, POST /get_shipping
+- Store:    POST /products/{id}/price
+
+One StubServer serves all of them. Every request can be delayed by `latency` seconds
+(plus up to `jitter`) and fails with a 500 at `error_rate`. Request counts are kept
+per endpoint so a benchmark can report requests per cycle.
+"""
+
+import json
+import random
+import re
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+NOCODB_RECORDS = re.compile(r"^/api/v2/tables/([^/]+)/([^/]+)/records(?:/([^/]+))?$")
+SUPPLIER_PRODUCT = re.compile(r"^/products/([^/]+)$")
+STORE_PRICE = re.compile(r"^/products/([^/]+)/price$")
+
+
+class StubState:
+    def __init__(self, latency=0.0, jitter=0.0, error_rate=0.0, seed=None):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.random = random.Random(seed)
+        self.tables = {}
+        self.next_ids = {}
+        self.counts = Counter()
+        self.lock = threading.Lock()
+
+    def seed_table(self, project, table, rows):
+        with self.lock:
+            records = self.tables.setdefault((project, table), {})
+            for row in rows:
+                row = dict(row)
+                row.setdefault("id", self.next_ids.get((project, table), 1))
+                records[row["id"]] = row
+                self.next_ids[(project, table)] = max(self.next_ids.get((project, table), 1), row["id"] + 1)
+
+    def snapshot_counts(self):
+        with self.lock:
+            return Counter(self.counts)
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    @property
+    def state(self):
+        return self.server.state
+
+    def _read_json(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        if not length:
+            return None
+        return json.loads(self.rfile.read(length))
+
+    def _reply(self, status, body):
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _handle(self, method):
+        state = self.state
+        parsed = urlparse(self.path)
+        body = self._read_json() if method in ("POST", "PATCH") else None
+        endpoint, handler = self._route(method, parsed.path)
+        with state.lock:
+            state.counts[endpoint] += 1
+            delay = state.latency + (state.random.random() * state.jitter if state.jitter else 0)
+            fail = state.error_rate and state.random.random() < state.error_rate
+        if delay:
+            time.sleep(delay)
+        if fail:
+            return self._reply(500, {"error": "injected failure"})
+        if handler is None:
+            return self._reply(404, {"error": f"no stub for {method} {parsed.path}"})
+        status, payload = handler(parse_qs(parsed.query), body)
+        self._reply(status, payload)
+
+    def _route(self, method, path):
+        m = NOCODB_RECORDS.match(path)
+        if m:
+            project, table, record_id = m.groups()
+            key = (project, table)
+            if method == "GET" and not record_id:
+                return "nocodb.list", lambda q, b: self._nocodb_list(key, q)
+            if method == "POST" and not record_id:
+                return "nocodb.insert", lambda q, b: self._nocodb_insert(key, b)
+            if method == "PATCH" and record_id:
+                return "nocodb.update", lambda q, b: self._nocodb_update(key, record_id, b)
+            return "nocodb.other", None
+        m = STORE_PRICE.match(path)
+        if m and method == "POST":
+            return "store.price", lambda q, b: (200, {"id": m.group(1), "price": (b or {}).get("price")})
+        m = SUPPLIER_PRODUCT.match(path)
+        if m and method == "GET":
+            return "supplier.product", lambda q, b: (200, self._supplier_product(m.group(1)))
+        if path.endswith("/get_shipping") and method == "POST":
+            return "supplier.get_shipping", lambda q, b: (200, {"shipping_price": self._shipping_price(b)})
+        if path.endswith("/shipping") and method == "POST":
+            return "supplier.shipping", lambda q, b: (200, {"options": [
+                {"carrier": "standard", "price": self._shipping_price(b), "days": 7},
+                {"carrier": "express", "price": round(self._shipping_price(b) * 2.5, 2), "days": 2}
+            ]})
+        return "unknown", None
+
+    # --- NocoDB ---
+    def _nocodb_list(self, key, query):
+        state = self.state
+        with state.lock:
+            rows = list(state.tables.get(key, {}).values())
+        where = query.get("where", [None])[0]
+        if where:
+            m = re.match(r"^\((\w+),eq,(.*)\)$", where)
+            if m:
+                field, value = m.groups()
+                rows = [r for r in rows if str(r.get(field)) == value]
+        total = len(rows)
+        offset = int(query.get("offset", [0])[0])
+        limit = int(query.get("limit", [0])[0]) or 25  # NocoDB's default page size
+        page = rows[offset:offset + limit]
+        return 200, {"list": page, "pageInfo": {
+            "totalRows": total,
+            "pageSize": limit,
+            "isLastPage": offset + len(page) >= total
+        }}
+
+    def _nocodb_insert(self, key, body):
+        state = self.state
+        with state.lock:
+            record_id = state.next_ids.get(key, 1)
+            state.next_ids[key] = record_id + 1
+            state.tables.setdefault(key, {})[record_id] = dict(body or {}, id=record_id)
+        return 200, {"id": record_id}
+
+    def _nocodb_update(self, key, record_id, body):
+        state = self.state
+        record_id = int(record_id) if record_id.isdigit() else record_id
+        with state.lock:
+            record = state.tables.get(key, {}).get(record_id)
+            if record is None:
+                return 404, {"error": "record not found"}
+            record.update(body or {})
+        return 200, {"id": record_id}
+
+    # --- Supplier ---
+    def _supplier_product(self, product_id):
+        # Deterministic per product so repeated runs see the same prices
+        h = sum(product_id.encode())
+        return {"id": product_id, "price": f"{4 + (h % 300) / 100:.2f}", "stock": 50 + h % 500}
+
+    def _shipping_price(self, body):
+        quantity = int((body or {}).get("quantity", 1))
+        return round(2.5 + 0.4 * quantity, 2)
+
+    def do_GET(self):
+        self._handle("GET")
+
+    def do_POST(self):
+        self._handle("POST")
+
+    def do_PATCH(self):
+        self._handle("PATCH")
+
+
+class StubHTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 1024
+
+
+class StubServer:
+    """Run the stub services on a background thread: `with StubServer() as stub: stub.url`."""
+
+    def __init__(self, host="127.0.0.1", port=0, **state_kwargs):
+        self.state = StubState(**state_kwargs)
+        self.httpd = StubHTTPServer((host, port), StubHandler)
+        self.httpd.state = self.state
+        self.thread = None
+
+    @property
+    def url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self.thread = threading.Thread(target=self.httpd.serve_forever, name="stub-server", daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
@@ -1,4 +1,9 @@
+import asyncio
+import inspect
 import random
+import threading
+from collections import OrderedDict
+from instrumentation import timed
 
 class ChatAI:
     def __init__(self):
@@ -8,6 +13,119 @@ class ChatAI:
             "I’m here 24/7 — feel free to ask about our products!"
         ]
 
+    def reply(self, message):
+        return random.choice(self.responses)
+
+    @timed("chat.listen_and_reply")
     def listen_and_reply(self):
         print("💬 Listening to customer queries (simulated)...")
         print(random.choice(self.responses))
+
+
+class ChatService:
+    """
+    Runs ChatAI as an asyncio service on its own thread, independent of the main loop.
+
+    Messages go in with submit(conversation_id, message) from any thread. Each conversation
+    is pinned to one of `concurrency` lanes, so replies within a conversation keep their
+    order while different conversations are answered in parallel. Replies to frequent
+    questions come from an LRU cache. `send_reply(conversation_id, reply)` may be sync or async;
+    sync ones run in the executor so a slow send doesn't hold up the other lanes.
+    watch_messages() feeds unread customer messages from NocoDB into submit().
+    """
+
+    def __init__(self, chat, send_reply, concurrency=8, cache_size=1024):
+        self.chat = chat
+        self.send_reply = send_reply
+        self.concurrency = concurrency
+        self.cache_size = cache_size
+        self.cache = OrderedDict()
+        self.loop = None
+        self.lanes = []
+        self._thread = None
+        self._ready = threading.Event()
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="chat-service", daemon=True)
+            self._thread.start()
+            self._ready.wait()
+        return self
+
+    def submit(self, conversation_id, message):
+        if self.loop is None or not self.lanes:
+            raise RuntimeError("ChatService is not running; call start() first")
+        lane = self.lanes[hash(conversation_id) % len(self.lanes)]
+        self.loop.call_soon_threadsafe(lane.put_nowait, (conversation_id, message))
+
+    def watch_messages(self, nocodb, interval=5):
+        """Submit unread messages from the NocoDB `messages` table every `interval` seconds.
+
+        Each message is marked answered once it is submitted. Returns an Event that stops the watch.
+        """
+        stop = threading.Event()
+
+        def run():
+            while not stop.wait(interval):
+                try:
+                    messages = nocodb.get_table("project_store", "messages", params={"where": "(status,eq,unread)"})
+                    for m in messages.get("list", []):
+                        if m.get("status") != "unread":
+                            continue
+                        self.submit(m.get("conversation_id") or m["id"], m.get("message", ""))
+                        nocodb.update_record("project_store", "messages", m["id"], {"status": "answered"})
+                except Exception as e:
+                    print(f"⚠️ Chat message watch failed: {e}")
+
+        threading.Thread(target=run, name="chat-watch", daemon=True).start()
+        return stop
+
+    def stop(self, timeout=10):
+        """Answer everything already submitted, then stop the service."""
+        if self._thread is None:
+            return
+        for lane in self.lanes:
+            self.loop.call_soon_threadsafe(lane.put_nowait, None)
+        self._thread.join(timeout)
+        self._thread = None
+
+    def _run(self):
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+        self.lanes = [asyncio.Queue() for _ in range(self.concurrency)]
+        workers = [self.loop.create_task(self._worker(lane)) for lane in self.lanes]
+        self._ready.set()
+        try:
+            self.loop.run_until_complete(asyncio.gather(*workers))
+        finally:
+            self.loop.close()
+
+    async def _worker(self, lane):
+        while True:
+            item = await lane.get()
+            if item is None:
+                return
+            conversation_id, message = item
+            try:
+                reply = await self._reply(message)
+                if inspect.iscoroutinefunction(self.send_reply):
+                    await self.send_reply(conversation_id, reply)
+                else:
+                    await self.loop.run_in_executor(None, self.send_reply, conversation_id, reply)
+            except Exception as e:
+                print(f"⚠️ Chat reply to {conversation_id} failed: {e}")
+
+    async def _reply(self, message):
+        key = " ".join(str(message).lower().split())
+        if key in self.cache:
+            self.cache.move_to_end(key)
+            return self.cache[key]
+        if inspect.iscoroutinefunction(self.chat.reply):
+            reply = await self.chat.reply(message)
+        else:
+            # Blocking reply generators (e.g. model calls) must not stall the other lanes
+            reply = await self.loop.run_in_executor(None, self.chat.reply, message)
+        self.cache[key] = reply
+        if len(self.cache) > self.cache_size:
+            self.cache.popitem(last=False)
+        return reply
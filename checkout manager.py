@@ -1,5 +1,5 @@
 import os
-import requests
+from instrumentation import http_request, timed
 from database import (
     get_product_from_db,
     save_order,
@@ -28,6 +28,7 @@ paypalrestsdk.configure({
 })
 
 
+@timed("checkout.process_order")
 def process_order(customer, product_id, quantity, buyer_address):
     """
     Full AI-driven dropshipping workflow
@@ -40,8 +41,10 @@ def process_order(customer, product_id, quantity, buyer_address):
 
     # 2. Query supplier for shipping cost
     try:
-        response = requests.post(
+        response = http_request(
+            "POST",
             f"{supplier_api}/get_shipping",
+            endpoint="supplier.get_shipping",
             json={
                 "product_id": product_id,
                 "quantity": quantity,
@@ -119,7 +122,6 @@ def process_order(customer, product_id, quantity, buyer_address):
             })
             payout.create(sync_mode=True)
         elif supplier["payment_method"] == "stripe":
-            import stripe
             stripe.Transfer.create(
                 amount=int(supplier_amount * 100),
                 currency="usd",
@@ -1,3 +1,21 @@
 # 🔐 Replace with your NocoDB API URL and Token
 NOCODB_API_URL = "https://api.nocodb.com"
 NOCODB_TOKEN = "YOUR_NOCODB_API_TOKEN"
+
+# 📈 Stage / HTTP timing metrics (Prometheus text on /metrics, optional periodic JSON dump)
+METRICS_ENABLED = False
+METRICS_PORT = 9108
+METRICS_JSON_PATH = None  # e.g. "metrics.json"
+
+# 📦 Order work queue (SQLite file shared by all workers; ORDER_WORKERS = 0 processes orders inline)
+ORDER_QUEUE_PATH = "order_queue.db"
+ORDER_WORKERS = 4
+ORDER_POLL_SECONDS = 5
+ORDER_VISIBILITY_TIMEOUT = 60
+
+# 💬 Chat service: conversations answered in parallel (each conversation stays in order)
+CHAT_CONCURRENCY = 8
+CHAT_POLL_SECONDS = 5  # how often unread NocoDB messages are picked up; 0 disables
+
+# 📉 Local time-series history (engagement + price trends); None disables it
+TIMESERIES_DIR = "timeseries"
@@ -2,7 +2,10 @@
 # Autonomous AI Dropshipping Engine
 # -------------------------------
 
-import datetime
+from stock_reservation import StockReservations, new_tracking_number
+
+# Swap for SQLiteStockReservations() to reserve against the store DB
+stock_reservations = StockReservations()
 
 # --- Example Supplier & Product Classes ---
 class Supplier:
@@ -43,14 +46,19 @@ def fetch_competitor_price(product_name):
     return 100  # Example price
 
 # --- Step 3: Select best supplier ---
+def rank_suppliers(product, min_quality=80):
+    # Stock comes from the reservation backend, so units already reserved by other orders don't count
+    valid_suppliers = [s for s in product.suppliers
+                       if s.quality_score >= min_quality and stock_reservations.available(s) > 0]
+    # Lowest total cost first (base_price + shipping estimation)
+    return sorted(valid_suppliers, key=lambda s: s.base_price)
+
 def select_best_supplier(product, target_margin=0.2, min_quality=80):
-    valid_suppliers = [s for s in product.suppliers if s.stock > 0 and s.quality_score >= min_quality]
-    if not valid_suppliers:
+    candidates = rank_suppliers(product, min_quality)
+    if not candidates:
         print(f"No suitable supplier for {product.name}")
         return None
-
-    # Choose lowest total cost supplier (base_price + shipping estimation)
-    best_supplier = sorted(valid_suppliers, key=lambda s: s.base_price)[0]
+    best_supplier = candidates[0]
     product.selected_supplier = best_supplier
     return best_supplier
 
@@ -61,33 +69,90 @@ def calculate_selling_price(product, competitor_price):
     return round(price, 2)
 
 # --- Step 5: Place order with supplier ---
+def reserve_and_track(supplier, quantity, label):
+    # Reserve stock atomically so concurrent orders can't oversell
+    if not stock_reservations.reserve(supplier, quantity):
+        print(f"Not enough stock at {supplier.name} for {quantity} x {label}")
+        return None
+    return new_tracking_number()
+
 def place_supplier_order(product, quantity):
     supplier = product.selected_supplier
     if not supplier:
         return None
-    # Reduce stock in database
-    supplier.stock -= quantity
-    # Simulate tracking number
-    tracking_number = f"TRACK-{datetime.datetime.now().strftime('%Y%m%d%H%M%S')}"
-    return tracking_number
+    return reserve_and_track(supplier, quantity, product.name)
 
 # --- Step 6: Fulfill customer order ---
 def fulfill_order(order):
-    for item in order.items:
-        # Step 1: Load suppliers from DB
-        item.suppliers = get_suppliers_from_db(item.name)
+    fulfill_orders([order])
+
+def fulfill_orders(orders):
+    """
+    Fulfill a batch of orders. Suppliers and competitor prices are looked up once per
+    distinct product, then every line going to the same supplier is placed in one call
+    and shares its tracking id. Lines a supplier can't cover go to the next-best supplier.
+    """
+    # Group line items by product across all orders
+    batch = {}
+    for order in orders:
+        for item in order.items:
+            batch.setdefault(item.name, []).append((order, item))
+
+    # Group products by the supplier they were assigned to
+    by_supplier = {}
+    candidates = {}
+    for name, lines in batch.items():
+        product = lines[0][1]
+        # Step 1: Load suppliers from DB and reconcile them with the reservation counts
+        product.suppliers = get_suppliers_from_db(name)
+        for supplier in product.suppliers:
+            stock_reservations.refresh(supplier)
         # Step 2: Check competitor price
-        competitor_price = fetch_competitor_price(item.name)
+        competitor_price = fetch_competitor_price(name)
         # Step 3: Select supplier
-        select_best_supplier(item)
+        supplier = select_best_supplier(product)
+        candidates[name] = rank_suppliers(product)
         # Step 4: Set selling price
-        order.selling_price[item.name] = calculate_selling_price(item, competitor_price)
-        # Step 5: Place order
-        tracking = place_supplier_order(item, quantity=1)
+        selling_price = calculate_selling_price(product, competitor_price)
+        for order, item in lines:
+            item.suppliers = product.suppliers
+            item.selected_supplier = supplier
+            order.selling_price[name] = selling_price
+        if supplier:
+            by_supplier.setdefault(supplier.name, (supplier, {}))[1][name] = lines
+
+    # Step 5: Place one consolidated order per supplier
+    for supplier, products in by_supplier.values():
+        quantity = sum(len(lines) for lines in products.values())
+        tracking = reserve_and_track(supplier, quantity, f"{len(products)} product(s)")
         if tracking:
-            order.tracking_info[item.name] = tracking
-    order.status = "Processing"
-    print(f"Order for {order.customer_name} processed with tracking info: {order.tracking_info}")
+            for name, lines in products.items():
+                for order, item in lines:
+                    order.tracking_info[name] = tracking
+            continue
+        # Not enough stock for the whole batch; spread each product over its suppliers, best first
+        for name, lines in products.items():
+            place_with_fallback(name, lines, candidates[name])
+
+    for order in orders:
+        order.status = "Processing"
+        print(f"Order for {order.customer_name} processed with tracking info: {order.tracking_info}")
+
+def place_with_fallback(name, lines, suppliers):
+    remaining = lines
+    for supplier in suppliers:
+        if not remaining:
+            return
+        quantity = min(len(remaining), stock_reservations.available(supplier))
+        if quantity <= 0:
+            continue
+        tracking = reserve_and_track(supplier, quantity, name)
+        if not tracking:
+            continue  # taken by a concurrent order meanwhile; try the next supplier
+        for order, item in remaining[:quantity]:
+            item.selected_supplier = supplier
+            order.tracking_info[name] = tracking
+        remaining = remaining[quantity:]
 
 # --- Step 7: Track shipment and confirm delivery ---
 def track_and_confirm(order):
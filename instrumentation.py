@@ -0,0 +1,226 @@
+"""
+Timing instrumentation for stages and outbound HTTP calls.
+
+- @timed("store.process_orders") records latency histograms, call and error counts for a stage
+- http_request(method, url, endpoint=...) does the same for an outbound call, plus bytes
+- render_prometheus() / to_dict() expose the numbers; serve() and start_json_dump() publish them
+- http_request also feeds traffic_capture when a capture file is open
+
+Disabled unless THUNDER_METRICS=1 or enable() is called; when disabled, both wrappers
+only check a flag before calling straight through.
+"""
+
+import functools
+import json
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+
+import traffic_capture
+
+ENABLED = os.getenv("THUNDER_METRICS") == "1"
+
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+def enable(flag=True):
+    global ENABLED
+    ENABLED = flag
+
+
+class Series:
+    def __init__(self):
+        self.buckets = [0] * len(BUCKETS)
+        self.count = 0
+        self.total = 0.0
+        self.errors = 0
+        self.bytes_sent = 0
+        self.bytes_received = 0
+
+    def observe(self, seconds, error, bytes_sent, bytes_received):
+        self.count += 1
+        self.total += seconds
+        for i, bound in enumerate(BUCKETS):
+            if seconds <= bound:
+                self.buckets[i] += 1
+                break
+        if error:
+            self.errors += 1
+        self.bytes_sent += bytes_sent
+        self.bytes_received += bytes_received
+
+    def to_dict(self):
+        cumulative, running = {}, 0
+        for bound, n in zip(BUCKETS, self.buckets):
+            running += n
+            cumulative[str(bound)] = running
+        return {
+            "count": self.count,
+            "sum_seconds": round(self.total, 6),
+            "errors": self.errors,
+            "bytes_sent": self.bytes_sent,
+            "bytes_received": self.bytes_received,
+            "buckets": cumulative
+        }
+
+
+class Metrics:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.stages = {}
+        self.http = {}
+
+    def observe(self, kind, name, seconds, error=False, bytes_sent=0, bytes_received=0):
+        table = self.stages if kind == "stage" else self.http
+        with self.lock:
+            series = table.get(name)
+            if series is None:
+                series = table[name] = Series()
+            series.observe(seconds, error, bytes_sent, bytes_received)
+
+    def reset(self):
+        with self.lock:
+            self.stages.clear()
+            self.http.clear()
+
+    def to_dict(self):
+        with self.lock:
+            return {
+                "timestamp": time.time(),
+                "stages": {name: s.to_dict() for name, s in sorted(self.stages.items())},
+                "http": {name: s.to_dict() for name, s in sorted(self.http.items())}
+            }
+
+    def render_prometheus(self):
+        lines = []
+        with self.lock:
+            for metric, label, table, with_bytes in (
+                ("thunder_stage", "stage", self.stages, False),
+                ("thunder_http_request", "endpoint", self.http, True)
+            ):
+                lines.append(f"# TYPE {metric}_duration_seconds histogram")
+                for name, s in sorted(table.items()):
+                    running = 0
+                    for bound, n in zip(BUCKETS, s.buckets):
+                        running += n
+                        lines.append(f'{metric}_duration_seconds_bucket{{{label}="{name}",le="{bound}"}} {running}')
+                    lines.append(f'{metric}_duration_seconds_bucket{{{label}="{name}",le="+Inf"}} {s.count}')
+                    lines.append(f'{metric}_duration_seconds_sum{{{label}="{name}"}} {s.total:.6f}')
+                    lines.append(f'{metric}_duration_seconds_count{{{label}="{name}"}} {s.count}')
+                lines.append(f"# TYPE {metric}_errors_total counter")
+                for name, s in sorted(table.items()):
+                    lines.append(f'{metric}_errors_total{{{label}="{name}"}} {s.errors}')
+                if with_bytes:
+                    for field, suffix in (("bytes_sent", "sent"), ("bytes_received", "received")):
+                        lines.append(f"# TYPE {metric}_bytes_{suffix}_total counter")
+                        for name, s in sorted(table.items()):
+                            lines.append(f'{metric}_bytes_{suffix}_total{{{label}="{name}"}} {getattr(s, field)}')
+        return "\n".join(lines) + "\n"
+
+
+metrics = Metrics()
+
+
+def timed(name):
+    """Decorator recording latency and errors of a stage under `name`."""
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not ENABLED:
+                return fn(*args, **kwargs)
+            start = time.perf_counter()
+            error = False
+            try:
+                return fn(*args, **kwargs)
+            except Exception:
+                error = True
+                raise
+            finally:
+                metrics.observe("stage", name, time.perf_counter() - start, error)
+        return wrapper
+    return decorator
+
+
+def _body_size(body):
+    if body is None:
+        return 0
+    return len(body.encode() if isinstance(body, str) else body)
+
+
+def http_request(method, url, endpoint, **kwargs):
+    """requests.request() that records latency, bytes and errors under `endpoint`.
+
+    Also appends the exchange to the traffic capture file when capture is on.
+    """
+    recorder = traffic_capture.recorder
+    if not ENABLED and recorder is None:
+        return requests.request(method, url, **kwargs)
+    started_at = time.time()
+    start = time.perf_counter()
+    res = error = None
+    try:
+        res = requests.request(method, url, **kwargs)
+        return res
+    except Exception as e:
+        error = e
+        raise
+    finally:
+        elapsed = time.perf_counter() - start
+        # Bookkeeping must never replace the caller's response or exception
+        try:
+            if ENABLED:
+                if res is None:
+                    metrics.observe("http", endpoint, elapsed, error=True)
+                else:
+                    metrics.observe("http", endpoint, elapsed, error=res.status_code >= 400,
+                                    bytes_sent=_body_size(res.request.body), bytes_received=len(res.content))
+            if recorder is not None:
+                recorder.record(endpoint, method, url, kwargs, started_at, elapsed, res, error)
+        except Exception as e:
+            print(f"⚠️ Could not record {endpoint} request: {e}")
+
+
+# --- Publishing ---
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        if self.path.startswith("/metrics.json"):
+            body, content_type = json.dumps(metrics.to_dict()).encode(), "application/json"
+        elif self.path.startswith("/metrics"):
+            body, content_type = metrics.render_prometheus().encode(), "text/plain; version=0.0.4"
+        else:
+            self.send_error(404)
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def serve(port, host="0.0.0.0"):
+    """Serve /metrics (Prometheus text) and /metrics.json from a background thread."""
+    server = ThreadingHTTPServer((host, port), _MetricsHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="metrics-server", daemon=True).start()
+    return server
+
+
+def start_json_dump(path, interval=60):
+    """Write metrics.to_dict() to `path` every `interval` seconds from a background thread."""
+    stop = threading.Event()
+
+    def run():
+        while not stop.wait(interval):
+            tmp = f"{path}.tmp"
+            with open(tmp, "w") as f:
+                json.dump(metrics.to_dict(), f)
+            os.replace(tmp, path)
+
+    threading.Thread(target=run, name="metrics-dump", daemon=True).start()
+    return stop
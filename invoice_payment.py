@@ -1,19 +1,38 @@
 import uuid
+from instrumentation import timed
+
+# Invoice numbers derive from the order id, so retrying an order can't mint a second invoice number
+INVOICE_NAMESPACE = uuid.UUID("6f1c2a4e-3b7d-4c0e-9a51-2d8e7f4b1c93")
 
 class InvoicePayment:
     def __init__(self, nocodb):
         self.nocodb = nocodb
 
+    @timed("payments.generate_invoices")
     def generate_invoices(self):
         print("🧾 Generating invoices for completed orders...")
         orders = self.nocodb.get_table("project_store", "orders")
         for o in orders.get("list", []):
             if o.get("status") == "completed" and not o.get("invoice_id"):
-                invoice_id = str(uuid.uuid4())
-                print(f"Creating invoice {invoice_id} for order {o['id']}")
-                self.nocodb.insert_record("project_store", "invoices", {
-                    "order_id": o['id'],
-                    "invoice_number": invoice_id,
-                    "amount": o.get("total_price", 0),
-                    "status": "unpaid"
-                })
+                self.create_invoice(o)
+
+    @timed("payments.create_invoice")
+    def create_invoice(self, order):
+        """Create the invoice for an order unless it already has one. Safe to call repeatedly.
+
+        Mark invoices.invoice_number unique in NocoDB. The number is derived from the order id,
+        so if two calls for one order race, the second insert is rejected (and a queue worker
+        retries, finding the invoice already there) instead of creating a duplicate.
+        """
+        invoice_id = str(uuid.uuid5(INVOICE_NAMESPACE, str(order["id"])))
+        existing = self.nocodb.get_table("project_store", "invoices", params={"where": f"(invoice_number,eq,{invoice_id})"})
+        if not any(i.get("invoice_number") == invoice_id for i in existing.get("list", [])):
+            print(f"Creating invoice {invoice_id} for order {order['id']}")
+            self.nocodb.insert_record("project_store", "invoices", {
+                "order_id": order['id'],
+                "invoice_number": invoice_id,
+                "amount": order.get("total_price", 0),
+                "status": "unpaid"
+            })
+        self.nocodb.update_record("project_store", "orders", order['id'], {"invoice_id": invoice_id})
+        return invoice_id
@@ -1,29 +1,77 @@
 from nocodb import NocoDB
-from store_manager import StoreManager
-from marketing_ai import MarketingAI
+from storemanager import StoreManager
+from market_ai import MarketingAI
 from invoice_payment import InvoicePayment
-from chat_ai import ChatAI
-from config import NOCODB_API_URL, NOCODB_TOKEN
+from chat_ai import ChatAI, ChatService
+from order_queue import OrderQueue, OrderWorkerPool
+from timeseries import TimeSeriesStore
+from config import (
+    NOCODB_API_URL, NOCODB_TOKEN, METRICS_ENABLED, METRICS_PORT, METRICS_JSON_PATH,
+    ORDER_QUEUE_PATH, ORDER_WORKERS, ORDER_POLL_SECONDS, ORDER_VISIBILITY_TIMEOUT, CHAT_CONCURRENCY,
+    CHAT_POLL_SECONDS, TIMESERIES_DIR
+)
+import instrumentation
 import time
 
+@instrumentation.timed("main.cycle")
+def run_cycle(store, payments, marketing):
+    store.sync_inventory()
+    store.process_orders()
+    # With order workers, the worker that completes an order also invoices it
+    if store.order_queue is None:
+        payments.generate_invoices()
+    marketing.auto_post()
+    marketing.analyze_engagement()
+
 def main():
     print("🧠 ThunderBrain Online... Initializing systems...")
 
+    if METRICS_ENABLED:
+        instrumentation.enable()
+        if METRICS_PORT:
+            instrumentation.serve(METRICS_PORT)
+            print(f"📈 Metrics on http://localhost:{METRICS_PORT}/metrics")
+        if METRICS_JSON_PATH:
+            instrumentation.start_json_dump(METRICS_JSON_PATH)
+
     # Initialize systems
     nocodb = NocoDB(api_url=NOCODB_API_URL, token=NOCODB_TOKEN)
-    store = StoreManager(nocodb)
-    marketing = MarketingAI(nocodb)
+    order_queue = OrderQueue(ORDER_QUEUE_PATH, visibility_timeout=ORDER_VISIBILITY_TIMEOUT) if ORDER_WORKERS else None
+    store = StoreManager(nocodb, order_queue)
+    marketing = MarketingAI(nocodb, history=TimeSeriesStore(TIMESERIES_DIR) if TIMESERIES_DIR else None)
     payments = InvoicePayment(nocodb)
-    chat = ChatAI()
+
+    # Chat runs on its own event loop, answering unread messages from the NocoDB messages table
+    def post_chat_reply(conversation_id, reply):
+        print(f"💬 [{conversation_id}] {reply}")
+        nocodb.insert_record("project_store", "messages", {
+            "conversation_id": conversation_id,
+            "message": reply,
+            "direction": "outbound",
+            "status": "sent"
+        })
+
+    chat_service = ChatService(ChatAI(), send_reply=post_chat_reply, concurrency=CHAT_CONCURRENCY).start()
+    if CHAT_POLL_SECONDS:
+        chat_service.watch_messages(nocodb, CHAT_POLL_SECONDS)
+        print(f"💬 Chat answering messages every {CHAT_POLL_SECONDS}s")
+
+    if order_queue:
+        # Workers need failed NocoDB calls to raise so the order is retried instead of acked
+        worker_db = NocoDB(api_url=NOCODB_API_URL, token=NOCODB_TOKEN, raise_errors=True)
+        worker_store, worker_payments = StoreManager(worker_db), InvoicePayment(worker_db)
+
+        def handle_order(order):
+            worker_store.complete_order(order)
+            worker_payments.create_invoice(order)
+
+        OrderWorkerPool(order_queue, handle_order, workers=ORDER_WORKERS).start()
+        store.watch_orders(ORDER_POLL_SECONDS)
+        print(f"📦 {ORDER_WORKERS} order workers running")
 
     while True:
         print("⚙️ Running main AI loop...")
-        store.sync_inventory()
-        store.process_orders()
-        payments.generate_invoices()
-        marketing.auto_post()
-        marketing.analyze_engagement()
-        chat.listen_and_reply()
+        run_cycle(store, payments, marketing)
 
         print("✅ Cycle complete. Sleeping for 5 minutes...")
         time.sleep(300)
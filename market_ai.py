@@ -1,9 +1,13 @@
 import random
+from instrumentation import timed
 
 class MarketingAI:
-    def __init__(self, nocodb):
+    def __init__(self, nocodb, notifications=None, history=None):
         self.nocodb = nocodb
+        self.notifications = notifications  # optional NotificationQueue
+        self.history = history  # optional TimeSeriesStore for engagement trends
 
+    @timed("marketing.auto_post")
     def auto_post(self):
         print("📣 Auto-posting products to social feeds...")
         posts = [
@@ -11,10 +15,21 @@ class MarketingAI:
             "💥 Big sale! Grab before stock ends!",
             "✨ Trending now — discover our bestsellers!"
         ]
-        print(random.choice(posts))
+        post = random.choice(posts)
+        print(post)
+        if self.notifications:
+            self.notifications.put(post, target="followers")
 
+    @timed("marketing.analyze_engagement")
     def analyze_engagement(self):
         print("📊 Analyzing engagement metrics...")
         followers = random.randint(100, 1000000)
         reach = random.randint(1000, 2000000)
         print(f"Followers: {followers}, Reach: {reach}")
+        if self.history:
+            # History is best-effort: a failed write must not stop the main loop
+            try:
+                self.history.append("engagement.followers", followers)
+                self.history.append("engagement.reach", reach)
+            except Exception as e:
+                print(f"⚠️ Could not record engagement history: {e}")
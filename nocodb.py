@@ -1,21 +1,40 @@
-import requests
+from instrumentation import http_request
 
 class NocoDB:
-    def __init__(self, api_url, token):
+    def __init__(self, api_url, token, raise_errors=False):
         self.api_url = api_url.rstrip("/")
         self.headers = {"xc-token": token}
+        self.raise_errors = raise_errors  # raise requests.HTTPError instead of returning error bodies
 
-    def get_table(self, project, table):
+    def _checked(self, res):
+        if self.raise_errors:
+            res.raise_for_status()
+        return res
+
+    def get_table(self, project, table, params=None):
         url = f"{self.api_url}/api/v2/tables/{project}/{table}/records"
-        res = requests.get(url, headers=self.headers)
+        res = self._checked(http_request("GET", url, endpoint="nocodb.get_table", headers=self.headers, params=params))
         return res.json() if res.ok else {}
 
+    def iter_table(self, project, table, params=None, page_size=100):
+        """Yield every record of a table, one page (limit/offset) at a time."""
+        params = dict(params or {})
+        offset = 0
+        while True:
+            params.update({"limit": page_size, "offset": offset})
+            data = self.get_table(project, table, params=params)
+            rows = data.get("list", [])
+            yield from rows
+            if not rows or data.get("pageInfo", {}).get("isLastPage", len(rows) < page_size):
+                return
+            offset += len(rows)
+
     def insert_record(self, project, table, data):
         url = f"{self.api_url}/api/v2/tables/{project}/{table}/records"
-        res = requests.post(url, headers=self.headers, json=data)
+        res = self._checked(http_request("POST", url, endpoint="nocodb.insert_record", headers=self.headers, json=data))
         return res.json()
 
     def update_record(self, project, table, record_id, data):
         url = f"{self.api_url}/api/v2/tables/{project}/{table}/records/{record_id}"
-        res = requests.patch(url, headers=self.headers, json=data)
+        res = self._checked(http_request("PATCH", url, endpoint="nocodb.update_record", headers=self.headers, json=data))
         return res.json()
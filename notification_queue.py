@@ -0,0 +1,123 @@
+import threading
+import time
+
+
+class NotificationQueue:
+    """In-process notification queue.
+
+    Messages are buffered per target and handed to `send_batch(target, messages)` from a
+    background thread once a target has `max_batch` messages or its oldest message has
+    waited `max_delay` seconds. The same message for the same target is dropped while it
+    is still queued, or if it was delivered within the last `dedupe_window` seconds; a
+    failed send does not count, so the message can be queued again.
+    """
+
+    def __init__(self, send_batch, max_batch=50, max_delay=2.0, dedupe_window=60.0):
+        self.send_batch = send_batch
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self.dedupe_window = dedupe_window
+        self._buffers = {}
+        self._oldest = {}
+        self._seen = {}
+        self._pending = set()
+        self._cond = threading.Condition()
+        self._closed = False
+        self._thread = None
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="notification-queue", daemon=True)
+            self._thread.start()
+        return self
+
+    def put(self, message, target="users"):
+        """Queue a message. Returns False if it was a duplicate inside the dedupe window."""
+        now = time.monotonic()
+        key = (target, message)
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("NotificationQueue is closed")
+            last = self._seen.get(key)
+            if key in self._pending or (last is not None and now - last < self.dedupe_window):
+                return False
+            self._pending.add(key)
+            self._buffers.setdefault(target, []).append(message)
+            if target not in self._oldest:
+                # First message for this target: wake the worker so it arms the max_delay deadline
+                self._oldest[target] = now
+                self._cond.notify()
+            elif len(self._buffers[target]) >= self.max_batch:
+                self._cond.notify()
+        return True
+
+    def flush(self):
+        """Send everything buffered right now, on the calling thread."""
+        with self._cond:
+            batches = self._take(list(self._buffers))
+        self._send(batches)
+
+    def close(self, timeout=10):
+        with self._cond:
+            self._closed = True
+            self._cond.notify()
+        if self._thread is not None:
+            self._thread.join(timeout)
+        self.flush()
+
+    def _take(self, targets):
+        batches = []
+        for target in targets:
+            messages = self._buffers.pop(target, [])
+            self._oldest.pop(target, None)
+            for i in range(0, len(messages), self.max_batch):
+                batches.append((target, messages[i:i + self.max_batch]))
+        return batches
+
+    def _due(self, now):
+        return [
+            t for t, msgs in self._buffers.items()
+            if len(msgs) >= self.max_batch or now - self._oldest[t] >= self.max_delay
+        ]
+
+    def _prune_seen(self, now):
+        expired = [k for k, seen_at in self._seen.items() if now - seen_at >= self.dedupe_window]
+        for k in expired:
+            del self._seen[k]
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while True:
+                    now = time.monotonic()
+                    due = self._due(now)
+                    if due or self._closed:
+                        break
+                    timeout = None
+                    if self._oldest:
+                        timeout = max(min(self._oldest.values()) + self.max_delay - now, 0)
+                    self._cond.wait(timeout)
+                if self._closed:
+                    due = list(self._buffers)
+                batches = self._take(due)
+                self._prune_seen(now)
+                closed = self._closed
+            self._send(batches)
+            if closed:
+                return
+
+    def _send(self, batches):
+        for target, messages in batches:
+            try:
+                self.send_batch(target, messages)
+                sent = True
+            except Exception as e:
+                sent = False
+                print(f"⚠️ Failed to send {len(messages)} notifications to {target}: {e}")
+            now = time.monotonic()
+            with self._cond:
+                for message in messages:
+                    key = (target, message)
+                    self._pending.discard(key)
+                    if sent:
+                        self._seen[key] = now
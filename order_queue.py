@@ -0,0 +1,169 @@
+"""
+Durable local work queue for orders, backed by SQLite.
+
+- enqueue(order) is idempotent per order id, so re-discovering a pending order is harmless
+- claim() leases the oldest available order to one worker for `visibility_timeout` seconds;
+  if the worker dies the lease runs out and another worker picks the order up (at-least-once)
+- complete() / fail() settle the lease; failures are retried with a delay up to `max_attempts`,
+  and so are expired leases, after which the order is parked as 'failed'
+
+Any number of threads or processes can share one queue file.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS order_jobs (
+    order_id TEXT PRIMARY KEY,
+    payload TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'queued',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    lease_owner TEXT,
+    available_at REAL NOT NULL,
+    enqueued_at REAL NOT NULL,
+    updated_at REAL NOT NULL,
+    last_error TEXT
+);
+CREATE INDEX IF NOT EXISTS order_jobs_ready ON order_jobs (status, available_at);
+"""
+
+
+class OrderQueue:
+    def __init__(self, path="order_queue.db", visibility_timeout=60, max_attempts=5, retry_delay=10):
+        self.path = path
+        self.visibility_timeout = visibility_timeout
+        self.max_attempts = max_attempts
+        self.retry_delay = retry_delay
+        self._local = threading.local()
+        conn = self._conn()
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.executescript(SCHEMA)
+
+    def _conn(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def enqueue(self, order):
+        """Queue an order dict (must have an 'id'). Returns False if it was already queued."""
+        now = time.time()
+        cur = self._conn().execute(
+            "INSERT OR IGNORE INTO order_jobs (order_id, payload, available_at, enqueued_at, updated_at) VALUES (?, ?, ?, ?, ?)",
+            (str(order["id"]), json.dumps(order), now, now, now)
+        )
+        return cur.rowcount == 1
+
+    def claim(self, worker_id):
+        """Lease the next available order to `worker_id`; returns the order dict or None."""
+        conn = self._conn()
+        now = time.time()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            # Leases that ran out on their last attempt (worker crashed or hung every time) are parked,
+            # otherwise a poison order would be re-claimed forever
+            conn.execute(
+                "UPDATE order_jobs SET status='failed', lease_owner=NULL, updated_at=?, "
+                "last_error=COALESCE(last_error, 'lease expired') "
+                "WHERE status='leased' AND available_at <= ? AND attempts >= ?",
+                (now, now, self.max_attempts)
+            )
+            row = conn.execute(
+                "SELECT order_id, payload FROM order_jobs WHERE status IN ('queued', 'leased') AND available_at <= ? "
+                "ORDER BY available_at LIMIT 1",
+                (now,)
+            ).fetchone()
+            if row is None:
+                conn.execute("COMMIT")
+                return None
+            conn.execute(
+                "UPDATE order_jobs SET status='leased', lease_owner=?, attempts=attempts + 1, available_at=?, updated_at=? "
+                "WHERE order_id=?",
+                (worker_id, now + self.visibility_timeout, now, row[0])
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return json.loads(row[1])
+
+    def complete(self, order_id, worker_id):
+        """Mark a leased order done. Returns False if the lease was lost to another worker."""
+        cur = self._conn().execute(
+            "UPDATE order_jobs SET status='done', updated_at=? WHERE order_id=? AND lease_owner=? AND status='leased'",
+            (time.time(), str(order_id), worker_id)
+        )
+        return cur.rowcount == 1
+
+    def fail(self, order_id, worker_id, error):
+        """Release a leased order for retry, or park it as 'failed' after max_attempts."""
+        now = time.time()
+        cur = self._conn().execute(
+            "UPDATE order_jobs SET status=CASE WHEN attempts >= ? THEN 'failed' ELSE 'queued' END, "
+            "lease_owner=NULL, available_at=?, updated_at=?, last_error=? "
+            "WHERE order_id=? AND lease_owner=? AND status='leased'",
+            (self.max_attempts, now + self.retry_delay, now, str(error), str(order_id), worker_id)
+        )
+        return cur.rowcount == 1
+
+    def stats(self):
+        rows = self._conn().execute("SELECT status, COUNT(*) FROM order_jobs GROUP BY status").fetchall()
+        return dict(rows)
+
+
+class OrderWorkerPool:
+    """Threads that claim orders from an OrderQueue and pass them to `handle(order)`."""
+
+    def __init__(self, queue, handle, workers=4, poll_interval=0.5):
+        self.queue = queue
+        self.handle = handle
+        self.workers = workers
+        self.poll_interval = poll_interval
+        self._stop = threading.Event()
+        self._threads = []
+        self._prefix = f"{os.getpid()}-{uuid.uuid4().hex[:6]}"
+
+    def start(self):
+        for i in range(self.workers):
+            t = threading.Thread(target=self._run, args=(f"{self._prefix}-{i}",), name=f"order-worker-{i}", daemon=True)
+            t.start()
+            self._threads.append(t)
+        return self
+
+    def stop(self, timeout=10):
+        self._stop.set()
+        for t in self._threads:
+            t.join(timeout)
+
+    def _run(self, worker_id):
+        while not self._stop.is_set():
+            try:
+                order = self.queue.claim(worker_id)
+            except sqlite3.OperationalError as e:
+                print(f"⚠️ Order queue busy ({e}); retrying")
+                self._stop.wait(self.poll_interval)
+                continue
+            if order is None:
+                self._stop.wait(self.poll_interval)
+                continue
+            try:
+                self.handle(order)
+            except Exception as e:
+                print(f"⚠️ Order {order['id']} failed: {e}")
+                self._settle(self.queue.fail, order, worker_id, e)
+            else:
+                self._settle(self.queue.complete, order, worker_id)
+
+    def _settle(self, settle, order, worker_id, *args):
+        # If the queue can't be updated, keep the worker alive; the lease expires and the order is retried
+        try:
+            settle(order["id"], worker_id, *args)
+        except Exception as e:
+            print(f"⚠️ Could not settle order {order['id']} ({e}); it will be retried when its lease expires")
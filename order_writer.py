@@ -0,0 +1,167 @@
+"""
+Group-commit writer for checkout orders.
+
+Checkout threads hand their order rows to submit(), which blocks until the row is durable
+and returns its order id. A single writer thread collects whatever arrived in the last
+few milliseconds (up to `max_batch` rows), inserts them, applies the summed profit per
+product and commits once, so many orders share one fsync.
+"""
+
+import queue
+import sqlite3
+import threading
+import time
+from concurrent.futures import Future, TimeoutError
+
+INSERT_ORDER = """
+    INSERT INTO orders (product_id, quantity, buyer_country, buyer_region, buyer_city, buyer_postal, supplier_price, shipping_cost, selling_price, profit)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+
+def order_row(order_data):
+    address = order_data["buyer_address"]
+    return (
+        order_data["product_id"],
+        order_data["quantity"],
+        address["country"],
+        address["region"],
+        address["city"],
+        address["postal_code"],
+        order_data["supplier_price"],
+        order_data["shipping_cost"],
+        order_data["selling_price"],
+        order_data["profit"]
+    )
+
+
+class GroupCommitWriter:
+    def __init__(self, db_path="store.db", max_batch=256, max_delay=0.005):
+        self.db_path = db_path
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self._queue = queue.Queue()
+        self._thread = None
+        self._lock = threading.Lock()
+        self._closed = False
+        self._error = None  # set if the writer thread died; fails every pending and later submit
+        self._batch = []
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="order-writer", daemon=True)
+            self._thread.start()
+        return self
+
+    def submit(self, order_data, timeout=None):
+        """Save the order and add its profit to the product; returns the committed order id.
+
+        With a timeout, TimeoutError means the order was withdrawn and will not be written.
+        Once the writer has picked it up it can't be withdrawn, so submit waits for the outcome.
+        Raises RuntimeError if the writer isn't running (not started, closed, or crashed).
+        """
+        future = Future()
+        with self._lock:
+            if self._error is not None:
+                raise RuntimeError(f"Order writer stopped: {self._error}") from self._error
+            if self._closed or self._thread is None:
+                raise RuntimeError("Order writer is not running")
+            self._queue.put((order_data, future))
+        try:
+            return future.result(timeout)
+        except TimeoutError:
+            if future.cancel():
+                raise
+            return future.result()
+
+    def close(self):
+        with self._lock:
+            self._closed = True
+        if self._thread is not None:
+            self._queue.put(None)
+            self._thread.join()
+            self._thread = None
+
+    def _run(self):
+        try:
+            conn = sqlite3.connect(self.db_path, timeout=30)
+            try:
+                self._loop(conn)
+            finally:
+                conn.close()
+        except Exception as e:
+            print(f"⚠️ Order writer stopped: {e}")
+            self._fail_all(e)
+
+    def _fail_all(self, error):
+        # Under the lock, so no submit can slip in after the queue is drained
+        with self._lock:
+            self._error = error
+            pending = list(self._batch)
+            while True:
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is not None:
+                    pending.append(item)
+        for _, future in pending:
+            if not future.done():
+                future.set_exception(error)
+
+    def _loop(self, conn):
+        while True:
+            first = self._queue.get()
+            if first is None:
+                return
+            batch = [first]
+            deadline = time.monotonic() + self.max_delay
+            stop = False
+            while len(batch) < self.max_batch:
+                remaining = deadline - time.monotonic()
+                try:
+                    item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is None:
+                    stop = True
+                    break
+                batch.append(item)
+            # Drop orders whose submitter timed out; the rest can no longer be cancelled
+            self._batch = [item for item in batch if item[1].set_running_or_notify_cancel()]
+            if self._batch:
+                self._commit(conn, self._batch)
+            self._batch = []
+            if stop:
+                return
+
+    def _write(self, conn, batch):
+        cursor = conn.cursor()
+        order_ids = []
+        profits = {}
+        for order_data, _ in batch:
+            cursor.execute(INSERT_ORDER, order_row(order_data))
+            order_ids.append(cursor.lastrowid)
+            product_id = order_data["product_id"]
+            profits[product_id] = profits.get(product_id, 0) + order_data["profit"]
+        cursor.executemany(
+            "UPDATE products SET total_profit = total_profit + ? WHERE id=?",
+            [(profit, product_id) for product_id, profit in profits.items()]
+        )
+        conn.commit()
+        return order_ids
+
+    def _commit(self, conn, batch):
+        try:
+            order_ids = self._write(conn, batch)
+        except Exception as e:
+            conn.rollback()
+            if len(batch) == 1:
+                batch[0][1].set_exception(e)
+                return
+            # Don't let one bad row fail everyone else's checkout: retry one by one
+            for item in batch:
+                self._commit(conn, [item])
+            return
+        for (_, future), order_id in zip(batch, order_ids):
+            future.set_result(order_id)
@@ -10,12 +10,14 @@ Smart Supply Core
 Environment variables expected:
 - SUPPLIER_<N>_API_KEY and SUPPLIER_<N>_BASE_URL for each supplier configured
 - STORE_API_KEY (optional) for pushing updates to your live store
+- TIMESERIES_DIR (optional) to keep price history in a local TimeSeriesStore
 """
 
 import os
 import time
 import logging
-import requests
+from instrumentation import http_request, timed
+from timeseries import TimeSeriesStore
 from decimal import Decimal, ROUND_HALF_UP
 from typing import List, Dict, Optional, Tuple
 
@@ -23,6 +25,9 @@ from typing import List, Dict, Optional, Tuple
 logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s")
 logger = logging.getLogger("smart_supply_core")
 
+# Price history for dashboards (series "price.<product_id>"); None disables it
+price_history = TimeSeriesStore(os.environ["TIMESERIES_DIR"]) if os.getenv("TIMESERIES_DIR") else None
+
 # --- === Placeholder DB functions (replace with your actual DB layer) === ---
 def fetch_all_tracked_products() -> List[Dict]:
     """
@@ -105,6 +110,12 @@ def record_price_change(product_id: int, old_price: Decimal, new_price: Decimal,
     Save a price change audit record for traceability.
     """
     logger.info(f"DB: record price change {product_id}: {old_price} -> {new_price} ({reason})")
+    if price_history is not None:
+        # History is best-effort: a failed write must not stop the price push to the store
+        try:
+            price_history.append(f"price.{product_id}", new_price)
+        except Exception as e:
+            logger.warning(f"Could not record price history for {product_id}: {e}")
 
 
 # --- === Supplier API helpers === ---
@@ -128,7 +139,7 @@ class SupplierClient:
         """
         url = f"{self.base_url}/products/{supplier_product_id}"
         logger.debug(f"Supplier API request GET {url}")
-        resp = requests.get(url, headers=self.headers, timeout=self.timeout)
+        resp = http_request("GET", url, endpoint="supplier.get_product_info", headers=self.headers, timeout=self.timeout)
         resp.raise_for_status()
         return resp.json()
 
@@ -138,7 +149,7 @@ class SupplierClient:
         """
         url = f"{self.base_url}/shipping"
         payload = {"product_id": supplier_product_id, "quantity": qty, "destination": destination}
-        resp = requests.post(url, json=payload, headers=self.headers, timeout=self.timeout)
+        resp = http_request("POST", url, endpoint="supplier.shipping", json=payload, headers=self.headers, timeout=self.timeout)
         resp.raise_for_status()
         return resp.json().get("options", [])
 
@@ -188,6 +199,7 @@ def ensure_minimum_margin(target_price: Decimal, supplier_unit_cost: Decimal, mi
 
 
 # --- === Core sync logic for a single product === ---
+@timed("supply.sync_product_price")
 def sync_product_price(product: Dict):
     """
     Sync logic for one product:
@@ -305,7 +317,7 @@ def push_price_to_store_api(product_id: int, new_price: Decimal):
     headers = {"Authorization": f"Bearer {store_api_key}", "Content-Type": "application/json"}
     payload = {"price": str(new_price)}
     try:
-        resp = requests.post(url, json=payload, headers=headers, timeout=8)
+        resp = http_request("POST", url, endpoint="store.push_price", json=payload, headers=headers, timeout=8)
         resp.raise_for_status()
         logger.info(f"Pushed new price for product {product_id} to store API.")
     except Exception as e:
@@ -313,6 +325,7 @@ def push_price_to_store_api(product_id: int, new_price: Decimal):
 
 
 # --- === Main run loop / orchestration === ---
+@timed("supply.run_sync_cycle")
 def run_sync_cycle():
     """
     One cycle execution, safe to call from a scheduler.
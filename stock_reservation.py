@@ -0,0 +1,157 @@
+import sqlite3
+import threading
+import uuid
+from datetime import datetime
+
+
+def new_tracking_number():
+    """Tracking ids stay readable (timestamp) but are unique even within the same second."""
+    return f"TRACK-{datetime.now().strftime('%Y%m%d%H%M%S')}-{uuid.uuid4().hex[:12].upper()}"
+
+
+class StockReservations:
+    """In-memory stock reservations keyed by supplier name.
+
+    The counter lives here, not on the Supplier object: get_suppliers_from_db hands out a
+    fresh object per fulfillment, so each name keeps one shared count. refresh() folds each
+    new DB reading into it: a restock (the reading going up since the last one) is added,
+    while reservations made here, which the DB doesn't know about, are kept.
+    Check-and-decrement happens under one of `stripes` locks chosen by supplier name,
+    so concurrent workers only contend when they order from the same supplier.
+    """
+
+    def __init__(self, stripes=64):
+        self.locks = [threading.Lock() for _ in range(stripes)]
+        self.stock = {}
+        self._db_stock = {}  # last DB reading per supplier
+
+    def _lock_for(self, name):
+        return self.locks[hash(name) % len(self.locks)]
+
+    def _seed(self, supplier):
+        if supplier.name not in self.stock:
+            self.stock[supplier.name] = self._db_stock[supplier.name] = supplier.stock
+        return self.stock[supplier.name]
+
+    def set_stock(self, name, stock):
+        """(Re)seed a supplier's stock, e.g. after reading it from the DB."""
+        with self._lock_for(name):
+            self.stock[name] = self._db_stock[name] = stock
+
+    def refresh(self, supplier):
+        """Reconcile with a freshly loaded Supplier (its .stock is the DB reading)."""
+        with self._lock_for(supplier.name):
+            last = self._db_stock.get(supplier.name)
+            if last is None or supplier.name not in self.stock:
+                self._seed(supplier)
+            else:
+                self.stock[supplier.name] += supplier.stock - last
+                self._db_stock[supplier.name] = supplier.stock
+            supplier.stock = self.stock[supplier.name]
+
+    def available(self, supplier):
+        with self._lock_for(supplier.name):
+            return self._seed(supplier)
+
+    def reserve(self, supplier, quantity):
+        with self._lock_for(supplier.name):
+            available = self._seed(supplier)
+            if available < quantity:
+                supplier.stock = available
+                return False
+            self.stock[supplier.name] = supplier.stock = available - quantity
+            return True
+
+    def release(self, supplier, quantity):
+        with self._lock_for(supplier.name):
+            available = self._seed(supplier)
+            self.stock[supplier.name] = supplier.stock = available + quantity
+
+
+SUPPLIERS_SCHEMA = """
+CREATE TABLE IF NOT EXISTS suppliers (
+    name TEXT PRIMARY KEY,
+    stock INTEGER NOT NULL DEFAULT 0
+)
+"""
+
+
+class SQLiteStockReservations:
+    """Stock reservations persisted in the `suppliers` table of the store DB.
+
+    The table (SUPPLIERS_SCHEMA) is created if missing; seed it with set_stock().
+    The conditional UPDATE makes the decrement atomic across threads and processes:
+    it only matches when enough stock is left, so the last unit can't be sold twice.
+    """
+
+    def __init__(self, db_path="store.db", timeout=30):
+        self.db_path = db_path
+        self.timeout = timeout
+        conn = self._connect()
+        try:
+            conn.execute(SUPPLIERS_SCHEMA)
+            conn.commit()
+        finally:
+            conn.close()
+
+    def _connect(self):
+        return sqlite3.connect(self.db_path, timeout=self.timeout)
+
+    def set_stock(self, name, stock):
+        conn = self._connect()
+        try:
+            conn.execute(
+                "INSERT INTO suppliers (name, stock) VALUES (?, ?) ON CONFLICT(name) DO UPDATE SET stock=excluded.stock",
+                (name, stock)
+            )
+            conn.commit()
+        finally:
+            conn.close()
+
+    def refresh(self, supplier):
+        """Add suppliers the table doesn't know yet; the table stays the source of truth."""
+        conn = self._connect()
+        try:
+            conn.execute("INSERT OR IGNORE INTO suppliers (name, stock) VALUES (?, ?)", (supplier.name, supplier.stock))
+            conn.commit()
+            supplier.stock = conn.execute("SELECT stock FROM suppliers WHERE name=?", (supplier.name,)).fetchone()[0]
+        finally:
+            conn.close()
+
+    def available(self, supplier):
+        conn = self._connect()
+        try:
+            row = conn.execute("SELECT stock FROM suppliers WHERE name=?", (supplier.name,)).fetchone()
+        finally:
+            conn.close()
+        return row[0] if row else supplier.stock
+
+    def reserve(self, supplier, quantity):
+        conn = self._connect()
+        try:
+            cursor = conn.cursor()
+            cursor.execute(
+                "UPDATE suppliers SET stock = stock - ? WHERE name=? AND stock >= ?",
+                (quantity, supplier.name, quantity)
+            )
+            reserved = cursor.rowcount == 1
+            if reserved:
+                cursor.execute("SELECT stock FROM suppliers WHERE name=?", (supplier.name,))
+                supplier.stock = cursor.fetchone()[0]
+            conn.commit()
+            return reserved
+        finally:
+            conn.close()
+
+    def release(self, supplier, quantity):
+        conn = self._connect()
+        try:
+            cursor = conn.cursor()
+            cursor.execute("UPDATE suppliers SET stock = stock + ? WHERE name=?", (quantity, supplier.name))
+            cursor.execute("SELECT stock FROM suppliers WHERE name=?", (supplier.name,))
+            row = cursor.fetchone()
+            if row:
+                supplier.stock = row[0]
+            conn.commit()
+        finally:
+            conn.close()
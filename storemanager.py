@@ -1,17 +1,54 @@
+import threading
+from instrumentation import timed
+
 class StoreManager:
-    def __init__(self, nocodb):
+    def __init__(self, nocodb, order_queue=None):
         self.nocodb = nocodb
+        self.order_queue = order_queue  # optional OrderQueue; orders are then completed by workers
 
+    @timed("store.sync_inventory")
     def sync_inventory(self):
         print("🛒 Syncing product inventory with NocoDB...")
         # Example logic to sync local & online inventory
         products = self.nocodb.get_table("project_store", "products")
         print(f"Fetched {len(products)} products.")
 
+    @timed("store.process_orders")
     def process_orders(self):
         print("📦 Checking new orders...")
+        if self.order_queue is not None:
+            queued = self.enqueue_pending_orders()
+            print(f"Queued {queued} new orders. Queue: {self.order_queue.stats()}")
+            return
         orders = self.nocodb.get_table("project_store", "orders")
         for o in orders.get("list", []):
             if o.get("status") == "pending":
-                print(f"Processing order {o['id']} for {o['customer_name']}")
-                self.nocodb.update_record("project_store", "orders", o['id'], {"status": "completed"})
+                self.complete_order(o)
+
+    def enqueue_pending_orders(self):
+        """Push pending orders into the work queue; already-queued orders are skipped.
+
+        Pages through every pending order: orders parked as failed in the queue stay pending
+        in NocoDB, so reading only the first page would let them hide newer orders.
+        """
+        orders = self.nocodb.iter_table("project_store", "orders", params={"where": "(status,eq,pending)"})
+        return sum(1 for o in orders if o.get("status") == "pending" and self.order_queue.enqueue(o))
+
+    def watch_orders(self, interval=5):
+        """Enqueue pending orders every `interval` seconds from a background thread."""
+        stop = threading.Event()
+
+        def run():
+            while not stop.wait(interval):
+                try:
+                    self.enqueue_pending_orders()
+                except Exception as e:
+                    print(f"⚠️ Order watch failed: {e}")
+
+        threading.Thread(target=run, name="order-watch", daemon=True).start()
+        return stop
+
+    @timed("store.complete_order")
+    def complete_order(self, order):
+        print(f"Processing order {order['id']} for {order['customer_name']}")
+        self.nocodb.update_record("project_store", "orders", order['id'], {"status": "completed"})
@@ -0,0 +1,258 @@
+"""
+Embedded append-only time-series store for price and engagement history.
+
+Each series is a directory of fixed-size segment files. A segment is a 128-byte header
+followed by an array of (timestamp, value) float64 pairs, memory-mapped for appends and
+scans. The header keeps the record count and the segment's time range, min, max and sum,
+so range scans skip non-overlapping segments, and rollups take whole segments that fall
+inside one bucket straight from the header.
+
+    store = TimeSeriesStore("timeseries")
+    store.append("price.1234", 19.6)
+    store.range("price.1234", start, end)           # [(ts, value), ...]
+    store.rollup("price.1234", start, end, "hour")  # [{"start", "count", "min", "max", "mean", "first", "last"}, ...]
+
+Only a bounded number of segments (`max_open`) are mapped at a time, so thousands of
+series don't exhaust file descriptors. One process writes a store at a time; readers in
+the same process are safe.
+"""
+
+import math
+import mmap
+import os
+import re
+import struct
+import threading
+import time
+from collections import OrderedDict
+
+MAGIC = b"TSEG0001"
+HEADER = struct.Struct("<8sQQdddddQ")  # magic, count, capacity, t_min, t_max, v_min, v_max, v_sum, sorted
+HEADER_SIZE = 128
+RECORD_SIZE = 16
+
+BUCKETS = {"minute": 60, "hour": 3600, "day": 86400}
+
+
+class Segment:
+    """One segment file. Its header fields are always in memory; the file itself is only
+    mapped between open() and close(), so idle segments hold no file descriptor."""
+
+    def __init__(self, path, capacity=None):
+        self.path = path
+        self.file = self.mm = self.records = None
+        if capacity is not None and not os.path.exists(path):
+            self.count, self.capacity = 0, capacity
+            self.t_min = self.v_min = math.inf
+            self.t_max = self.v_max = -math.inf
+            self.v_sum, self.sorted = 0.0, True
+            # Header first, under a temporary name: a crash never leaves a headerless .seg behind
+            tmp = f"{path}.tmp"
+            with open(tmp, "wb") as f:
+                f.truncate(HEADER_SIZE + capacity * RECORD_SIZE)
+                f.write(HEADER.pack(MAGIC, 0, capacity, self.t_min, self.t_max, self.v_min, self.v_max, self.v_sum, 1))
+            os.replace(tmp, path)
+            self.open()
+        else:
+            with open(path, "rb") as f:
+                header = f.read(HEADER.size)
+            if len(header) < HEADER.size:
+                raise ValueError(f"{path} is not a time-series segment")
+            magic, self.count, self.capacity, self.t_min, self.t_max, self.v_min, self.v_max, self.v_sum, is_sorted = \
+                HEADER.unpack(header)
+            if magic != MAGIC:
+                raise ValueError(f"{path} is not a time-series segment")
+            self.sorted = bool(is_sorted)
+
+    @property
+    def is_open(self):
+        return self.mm is not None
+
+    def open(self):
+        if self.mm is None:
+            self.file = open(self.path, "r+b")
+            self.mm = mmap.mmap(self.file.fileno(), 0)
+            self.records = memoryview(self.mm)[HEADER_SIZE:].cast("d")
+
+    def _write_header(self):
+        HEADER.pack_into(self.mm, 0, MAGIC, self.count, self.capacity, self.t_min, self.t_max,
+                         self.v_min, self.v_max, self.v_sum, int(self.sorted))
+
+    @property
+    def full(self):
+        return self.count >= self.capacity
+
+    def append(self, ts, value):
+        i = self.count * 2
+        self.records[i] = ts
+        self.records[i + 1] = value
+        if ts < self.t_max:
+            self.sorted = False
+        self.count += 1
+        self.t_min, self.t_max = min(self.t_min, ts), max(self.t_max, ts)
+        self.v_min, self.v_max = min(self.v_min, value), max(self.v_max, value)
+        self.v_sum += value
+        self._write_header()  # count last, after the record itself is in place
+
+    def overlaps(self, start, end):
+        return self.count and self.t_min <= end and self.t_max >= start
+
+    def _first_at_or_after(self, ts):
+        lo, hi, records = 0, self.count, self.records
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if records[mid * 2] < ts:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def scan(self, start, end):
+        records = self.records
+        first = self._first_at_or_after(start) if self.sorted else 0
+        for i in range(first, self.count):
+            ts = records[i * 2]
+            if ts > end:
+                if self.sorted:
+                    return
+                continue
+            if ts >= start:
+                yield ts, records[i * 2 + 1]
+
+    def edge_values(self):
+        """(first, last) values in time order; only meaningful for sorted segments."""
+        return self.records[1], self.records[self.count * 2 - 1]
+
+    def flush(self):
+        if self.mm is not None:
+            self.mm.flush()
+
+    def close(self):
+        if self.mm is not None:
+            self.records.release()
+            self.mm.close()
+            self.file.close()
+            self.file = self.mm = self.records = None
+
+
+class TimeSeriesStore:
+    """Series are created on first append. At most `max_open` segments are mapped at once;
+    the least recently used one is closed to make room, so one series per product stays
+    within the process's file descriptor limit."""
+
+    def __init__(self, root="timeseries", segment_records=65536, max_open=64):
+        self.root = root
+        self.segment_records = segment_records
+        self.max_open = max_open
+        self.lock = threading.RLock()
+        self._series = {}
+        self._open = OrderedDict()  # path -> mapped Segment, least recently used first
+        os.makedirs(root, exist_ok=True)
+
+    def _use(self, segment):
+        """Map `segment` if needed and mark it most recently used."""
+        if segment.path in self._open:
+            self._open.move_to_end(segment.path)
+            return segment
+        segment.open()
+        self._open[segment.path] = segment
+        while len(self._open) > self.max_open:
+            _, idle = self._open.popitem(last=False)
+            idle.close()
+        return segment
+
+    @staticmethod
+    def _dirname(series):
+        return re.sub(r"[^A-Za-z0-9_.-]", "_", series)
+
+    def _segments(self, series):
+        segments = self._series.get(series)
+        if segments is None:
+            path = os.path.join(self.root, self._dirname(series))
+            os.makedirs(path, exist_ok=True)
+            names = sorted(n for n in os.listdir(path) if n.endswith(".seg"))
+            segments = self._series[series] = [Segment(os.path.join(path, n)) for n in names]
+        return segments
+
+    def series_names(self):
+        return sorted(n for n in os.listdir(self.root) if os.path.isdir(os.path.join(self.root, n)))
+
+    def append(self, series, value, ts=None):
+        ts = time.time() if ts is None else ts
+        with self.lock:
+            segments = self._segments(series)
+            if not segments or segments[-1].full:
+                path = os.path.join(self.root, self._dirname(series), f"{len(segments):08d}.seg")
+                segments.append(Segment(path, capacity=self.segment_records))
+            self._use(segments[-1]).append(float(ts), float(value))
+
+    def range(self, series, start=-math.inf, end=math.inf):
+        """All (timestamp, value) points with start <= timestamp <= end, in time order."""
+        with self.lock:
+            points = []
+            in_order, prev_max = True, -math.inf
+            for segment in self._segments(series):
+                if not segment.overlaps(start, end):
+                    continue
+                in_order = in_order and segment.sorted and segment.t_min >= prev_max
+                prev_max = segment.t_max
+                points.extend(self._use(segment).scan(start, end))
+        return points if in_order else sorted(points)
+
+    def rollup(self, series, start, end, bucket="hour"):
+        """Downsample into fixed buckets ('minute', 'hour', 'day' or seconds)."""
+        width = BUCKETS.get(bucket, bucket)
+        acc = {}
+
+        def add(key, count, lo, hi, total, first_ts, first, last_ts, last):
+            b = acc.get(key)
+            if b is None:
+                acc[key] = [count, lo, hi, total, first_ts, first, last_ts, last]
+                return
+            b[0] += count
+            b[1], b[2] = min(b[1], lo), max(b[2], hi)
+            b[3] += total
+            if first_ts < b[4]:
+                b[4], b[5] = first_ts, first
+            if last_ts >= b[6]:
+                b[6], b[7] = last_ts, last
+
+        with self.lock:
+            for segment in self._segments(series):
+                if not segment.overlaps(start, end):
+                    continue
+                key = segment.t_min // width
+                if (segment.sorted and start <= segment.t_min and segment.t_max <= end
+                        and segment.t_max // width == key):
+                    # Whole segment inside one bucket: use the header aggregates, no scan
+                    first, last = self._use(segment).edge_values()
+                    add(key, segment.count, segment.v_min, segment.v_max, segment.v_sum,
+                        segment.t_min, first, segment.t_max, last)
+                    continue
+                for ts, value in self._use(segment).scan(start, end):
+                    add(ts // width, 1, value, value, value, ts, value, ts, value)
+
+        return [
+            {
+                "start": key * width,
+                "count": b[0],
+                "min": b[1],
+                "max": b[2],
+                "mean": b[3] / b[0],
+                "first": b[5],
+                "last": b[7]
+            }
+            for key, b in sorted(acc.items())
+        ]
+
+    def flush(self):
+        with self.lock:
+            for segment in self._open.values():
+                segment.flush()
+
+    def close(self):
+        with self.lock:
+            for segment in self._open.values():
+                segment.close()
+            self._open.clear()
+            self._series.clear()
@@ -0,0 +1,90 @@
+"""
+Opt-in capture of outbound HTTP traffic to a JSONL file for offline load testing.
+
+Each call made through instrumentation.http_request is appended as one JSON line:
+timestamp, endpoint, method, url (with query), request body, status, response body,
+elapsed time and error. Auth headers are never written. Replay a capture with
+benchmarks/replay.py.
+
+Enable with start_capture("requests.jsonl") or THUNDER_CAPTURE=requests.jsonl.
+"""
+
+import json
+import os
+import threading
+
+import requests
+
+recorder = None
+
+
+class TrafficRecorder:
+    def __init__(self, path, max_body=65536):
+        self.path = path
+        self.max_body = max_body
+        self.lock = threading.Lock()
+        self.file = open(path, "a", buffering=1, encoding="utf-8")
+
+    def _clip(self, text):
+        if text is None or len(text) <= self.max_body:
+            return text
+        return text[:self.max_body]
+
+    def record(self, endpoint, method, url, kwargs, started_at, elapsed, response=None, error=None):
+        if "json" in kwargs and kwargs["json"] is not None:
+            body = json.dumps(kwargs["json"])
+        else:
+            body = kwargs.get("data")
+            if isinstance(body, bytes):
+                body = body.decode("utf-8", "replace")
+        entry = {
+            "ts": round(started_at, 6),
+            "endpoint": endpoint,
+            "method": method.upper(),
+            "url": requests.Request(method, url, params=kwargs.get("params")).prepare().url,
+            "request_body": self._clip(body),
+            "status": response.status_code if response is not None else None,
+            "response_body": self._clip(response.text) if response is not None else None,
+            "elapsed_ms": round(elapsed * 1000, 3),
+            "error": f"{type(error).__name__}: {error}" if error else None
+        }
+        line = json.dumps(entry)
+        with self.lock:
+            self.file.write(line + "\n")
+
+    def close(self):
+        with self.lock:
+            self.file.close()
+
+
+def start_capture(path="requests.jsonl", max_body=65536):
+    global recorder
+    stop_capture()
+    recorder = TrafficRecorder(path, max_body=max_body)
+    return recorder
+
+
+def stop_capture():
+    global recorder
+    if recorder is not None:
+        recorder.close()
+        recorder = None
+
+
+def read_capture(path):
+    """Yield captured entries from a JSONL file, skipping lines that aren't captures."""
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                continue
+            if isinstance(entry, dict) and "method" in entry and "url" in entry and "ts" in entry:
+                yield entry
+
+
+if os.getenv("THUNDER_CAPTURE"):
+    start_capture(os.getenv("THUNDER_CAPTURE"))
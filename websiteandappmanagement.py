@@ -1,10 +1,19 @@
 import requests
 import json
+import os
 from datetime import datetime
+from analytics import AnalyticsAggregator
+from notification_queue import NotificationQueue
+from instrumentation import http_request, timed
 
 class WebsiteAppManager:
-    def __init__(self, nocodb_url, api_token):
+    def __init__(self, nocodb_url, api_token, page_size=1000, timeout=10, sync_state_path="app_sync_state.json"):
         self.nocodb_url = nocodb_url.rstrip('/')
+        self.page_size = page_size
+        self.timeout = timeout
+        self.sync_state_path = sync_state_path
+        self.last_synced = self._load_last_synced()
+        self.notifications = None
         self.headers = {
             "accept": "application/json",
             "xc-token": api_token,
@@ -17,7 +26,7 @@ class WebsiteAppManager:
     def get_website_data(self):
         """Fetch current website products, pages, and user activity."""
         url = f"{self.nocodb_url}/api/v1/website_data"
-        res = requests.get(url, headers=self.headers)
+        res = http_request("GET", url, endpoint="website.get_website_data", headers=self.headers)
         if res.status_code == 200:
             return res.json()
         return {"error": res.text}
@@ -25,63 +34,135 @@ class WebsiteAppManager:
     def update_website_content(self, content_id, updates):
         """Update website sections — e.g., banners, products, or blog posts."""
         url = f"{self.nocodb_url}/api/v1/website_data/{content_id}"
-        res = requests.patch(url, headers=self.headers, data=json.dumps(updates))
+        res = http_request("PATCH", url, endpoint="website.update_website_content", headers=self.headers, data=json.dumps(updates))
         return res.json()
 
     def post_new_product(self, product):
         """Automatically post new product listings on the store website."""
         url = f"{self.nocodb_url}/api/v1/products"
-        res = requests.post(url, headers=self.headers, data=json.dumps(product))
+        res = http_request("POST", url, endpoint="website.post_new_product", headers=self.headers, data=json.dumps(product))
         return res.json()
 
     # --------------------------
     # APP MANAGEMENT LOGIC
     # --------------------------
-    def sync_app_with_website(self):
-        """Sync app products, offers, and updates with the website."""
-        website_data = self.get_website_data()
-        if "error" in website_data:
-            return website_data
-        app_payload = {
-            "lastSynced": datetime.utcnow().isoformat(),
-            "websiteProducts": len(website_data.get("list", []))
-        }
+    def count_website_products(self):
+        """Read the product count from pageInfo without downloading the list."""
+        url = f"{self.nocodb_url}/api/v1/website_data"
+        res = http_request("GET", url, endpoint="website.count_website_products", headers=self.headers, params={"limit": 1})
+        res.raise_for_status()
+        total = res.json().get("pageInfo", {}).get("totalRows")
+        if total is None:
+            # No pageInfo in the response: count by paging rather than trusting a one-row page
+            return sum(1 for _ in self.iter_rows("/api/v1/website_data"))
+        return total
+
+    def get_changed_website_products(self, since=None):
+        """Website records updated after `since` (all records when since is None)."""
+        params = {"where": f"(UpdatedAt,gt,exactDate,{since})"} if since else None
+        return list(self.iter_rows("/api/v1/website_data", params))
+
+    def _load_last_synced(self):
+        if not self.sync_state_path or not os.path.exists(self.sync_state_path):
+            return None
+        with open(self.sync_state_path) as f:
+            return json.load(f).get("lastSynced")
+
+    def _save_last_synced(self, synced_at):
+        self.last_synced = synced_at
+        if not self.sync_state_path:
+            return
+        tmp = f"{self.sync_state_path}.tmp"
+        with open(tmp, "w") as f:
+            json.dump({"lastSynced": synced_at}, f)
+        os.replace(tmp, self.sync_state_path)
+
+    @timed("website.sync_app_with_website")
+    def sync_app_with_website(self, include_changes=False):
+        """Sync app products, offers, and updates with the website.
+
+        Only the product count is fetched by default. With include_changes, records
+        changed since the last delta sync are sent along, and the watermark moves
+        forward; it is kept in sync_state_path so restarts don't resend or lose changes.
+        """
+        synced_at = datetime.utcnow().isoformat()
+        try:
+            app_payload = {
+                "lastSynced": synced_at,
+                "websiteProducts": self.count_website_products()
+            }
+            if include_changes:
+                app_payload["changedProducts"] = self.get_changed_website_products(self.last_synced)
+                app_payload["changedSince"] = self.last_synced
+        except requests.HTTPError as e:
+            return {"error": e.response.text}
         url = f"{self.nocodb_url}/api/v1/app_sync"
-        res = requests.post(url, headers=self.headers, data=json.dumps(app_payload))
+        res = http_request("POST", url, endpoint="website.app_sync", headers=self.headers, data=json.dumps(app_payload))
+        # Count-only syncs carry no changes, so they must not move the delta watermark
+        if res.ok and include_changes:
+            self._save_last_synced(synced_at)
         return res.json()
 
     def push_notification(self, message, target="users"):
         """Send push notifications or updates to app users."""
+        return self.push_notifications(target, [message])
+
+    def push_notifications(self, target, messages):
+        """Send several notifications to one target in a single request."""
         url = f"{self.nocodb_url}/api/v1/notifications"
-        payload = {
-            "message": message,
-            "target": target,
-            "timestamp": datetime.utcnow().isoformat()
-        }
-        res = requests.post(url, headers=self.headers, data=json.dumps(payload))
+        timestamp = datetime.utcnow().isoformat()
+        payload = [{"message": m, "target": target, "timestamp": timestamp} for m in messages]
+        res = http_request("POST", url, endpoint="website.notifications", headers=self.headers, data=json.dumps(payload), timeout=self.timeout)
+        res.raise_for_status()
         return res.json()
 
+    def queue_notification(self, message, target="users"):
+        """Queue a notification for batched background delivery; returns False if deduplicated."""
+        if self.notifications is None:
+            self.notifications = NotificationQueue(self.push_notifications).start()
+        return self.notifications.put(message, target)
+
     # --------------------------
     # AUTOMATION & ANALYTICS
     # --------------------------
-    def analyze_performance(self):
-        """Pull analytics data and generate sales & engagement insights."""
-        url = f"{self.nocodb_url}/api/v1/analytics"
-        res = requests.get(url, headers=self.headers)
-        if res.status_code == 200:
+    def iter_rows(self, path, params=None):
+        """Page through a NocoDB list endpoint, yielding one row at a time."""
+        url = f"{self.nocodb_url}{path}"
+        params = dict(params or {})
+        offset = 0
+        while True:
+            params.update({"limit": self.page_size, "offset": offset})
+            res = http_request("GET", url, endpoint=f"website.list{path}", headers=self.headers, params=params)
+            res.raise_for_status()
             data = res.json()
-            report = {
-                "total_sales": sum(item.get("sales", 0) for item in data.get("list", [])),
-                "top_product": max(data.get("list", []), key=lambda x: x.get("sales", 0), default={}),
-                "average_engagement": round(sum(item.get("engagement", 0) for item in data.get("list", [])) / max(len(data.get("list", [])), 1), 2)
-            }
-            return report
-        return {"error": res.text}
+            rows = data.get("list", [])
+            yield from rows
+            if not rows or data.get("pageInfo", {}).get("isLastPage", len(rows) < self.page_size):
+                return
+            offset += len(rows)
+
+    @timed("website.analyze_performance")
+    def analyze_performance(self, top_k=5, aggregate=None):
+        """Pull analytics data and generate sales & engagement insights.
+
+        Rows are streamed page by page into an AnalyticsAggregator. Pass a previous
+        aggregate (e.g. AnalyticsAggregator.from_dict(saved)) to continue it: only rows
+        with an Id above its last_id are read, so nothing is counted twice.
+        """
+        agg = aggregate if aggregate is not None else AnalyticsAggregator(top_k=top_k)
+        params = {"sort": "Id"}
+        if agg.last_id is not None:
+            params["where"] = f"(Id,gt,{agg.last_id})"
+        try:
+            agg.add_rows(self.iter_rows("/api/v1/analytics", params))
+        except requests.HTTPError as e:
+            return {"error": e.response.text}
+        return agg.report()
 
     def auto_market_products(self):
         """Auto-post promotional content and manage social media integration."""
         marketing_message = "🔥 New deals available! Visit our app & website now!"
-        return self.push_notification(marketing_message, target="followers")
+        return {"queued": self.queue_notification(marketing_message, target="followers")}
 
 # --------------------------
 # EXAMPLE USAGE
@@ -93,3 +174,4 @@ if __name__ == "__main__":
     manager = WebsiteAppManager(nocodb_url, token)
     print(manager.analyze_performance())
     print(manager.auto_market_products())
+    manager.notifications.close()